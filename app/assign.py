@@ -4,16 +4,49 @@ This module provides functionality for calculating optimal task assignments
 based on user skills and workload.
 """
 
-from typing import List, Dict, Tuple
+from typing import List, Dict, NamedTuple, Optional, Tuple
 import logging
 from datetime import datetime
-from sqlalchemy.orm import Session
-from . import models, schemas, crud
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import Session, selectinload
+from . import models, schemas
 
-# Настройка логирования
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Числовое значение приоритета задачи (0-100)
+_PRIORITY_VALUES = {
+    models.TaskPriority.LOW: 25,
+    models.TaskPriority.MEDIUM: 50,
+    models.TaskPriority.HIGH: 75,
+    models.TaskPriority.CRITICAL: 100
+}
+
+# Коэффициенты важности факторов для каждой стратегии (сумма = 1):
+# (загруженность, навыки, приоритет, дедлайн)
+_WEIGHTS = {
+    "workload": (0.6, 0.2, 0.1, 0.1),
+    "skills": (0.1, 0.7, 0.1, 0.1),
+    "priority": (0.1, 0.2, 0.6, 0.1),
+    "balanced": (0.3, 0.3, 0.2, 0.2),
+}
+
+class AssignError(Exception):
+    """Ошибка назначения задач; status_code задает код HTTP-ответа."""
+    status_code = 500
+
+class ProjectNotFoundError(AssignError, ValueError):
+    """Проект для назначения задач не найден."""
+    status_code = 404
+
+class OptimizationResult(NamedTuple):
+    """
+    Результат работы оптимизатора: назначения и ID задач, оставшихся без исполнителя
+    """
+    assignments: List[schemas.TaskAssignmentResult]
+    unassigned_tasks: List[int]
+
 class TaskAssignmentOptimizer:
     """
     Класс для оптимального распределения задач между исполнителями
@@ -25,6 +58,7 @@ class TaskAssignmentOptimizer:
         self.db = db
         self.project_id = project_id
         self.optimize_for = optimize_for  # balanced, workload, skills, priority
+        self._weights = _WEIGHTS.get(optimize_for, _WEIGHTS["balanced"])
         
         # Получаем все задачи проекта, которые не назначены или находятся в статусе TODO
         self.tasks = db.query(models.Task).filter(
@@ -33,10 +67,12 @@ class TaskAssignmentOptimizer:
             models.Task.assignee_id.is_(None)
         ).all()
         
-        # Получаем всех участников проекта
-        project = crud.get_project(db, project_id)
+        # Получаем всех участников проекта одним дополнительным запросом
+        project = db.query(models.Project).options(
+            selectinload(models.Project.members)
+        ).filter(models.Project.id == project_id).first()
         if not project:
-            raise ValueError(f"Project with id {project_id} not found")
+            raise ProjectNotFoundError(f"Project with id {project_id} not found")
         
         self.users = project.members
         
@@ -45,305 +81,173 @@ class TaskAssignmentOptimizer:
         
         if not self.users:
             logger.info("No members found in project %s", project_id)
+        
+        self._preload_skill_maps()
     
-    def calculate_cost_matrix(self) -> List[List[float]]:
+    def _preload_skill_maps(self):
         """
-        Создаем матрицу стоимости для каждой пары (задача, пользователь)
-        Меньшее значение означает лучшее соответствие
-        
-        Матрица будет иметь размер len(tasks) x len(users)
+        Загружает уровни навыков всех участников и требуемые уровни всех задач
+        двумя запросами, чтобы расчет стоимости не обращался к БД для каждой пары
         """
-        cost_matrix = []
-        
-        for task in self.tasks:
-            task_costs = []
-            for user in self.users:
-                # Рассчитываем стоимость назначения на основе различных факторов
-                cost = self._calculate_assignment_cost(task, user)
-                task_costs.append(cost)
-            cost_matrix.append(task_costs)
+        self._user_skill_map: Dict[int, Dict[int, int]] = {}
+        user_rows = self.db.query(models.user_skill).filter(
+            models.user_skill.c.user_id.in_([user.id for user in self.users])
+        ).all()
+        for row in user_rows:
+            self._user_skill_map.setdefault(row.user_id, {})[row.skill_id] = row.level
         
-        return cost_matrix
+        self._task_skill_map: Dict[int, Dict[int, int]] = {}
+        task_rows = self.db.query(models.task_skill).filter(
+            models.task_skill.c.task_id.in_([task.id for task in self.tasks])
+        ).all()
+        for row in task_rows:
+            self._task_skill_map.setdefault(row.task_id, {})[row.skill_id] = row.required_level
     
-    def _calculate_assignment_cost(self, task: models.Task, user: models.User) -> float:
+    def calculate_cost_matrix(self, now: Optional[datetime] = None) -> np.ndarray:
         """
-        Рассчитываем "стоимость" назначения задачи пользователю
+        Создаем матрицу стоимости для каждой пары (задача, пользователь)
         Меньшее значение означает лучшее соответствие
         
+        Матрица будет иметь размер len(tasks) x len(users) и строится
+        векторно: факторы считаются один раз для задач и для пользователей,
+        а затем комбинируются через broadcasting
+        
         Учитываем:
         1. Загруженность пользователя
         2. Соответствие навыков задачи и пользователя
         3. Приоритет задачи
         4. Срок выполнения (если есть)
+        
+        now - момент, относительно которого считаются сроки (по умолчанию текущее время)
         """
-        # Начальная стоимость
-        cost = 100.0
-        
-        # Коэффициенты важности разных факторов (сумма = 1)
-        if self.optimize_for == "workload":
-            workload_weight = 0.6
-            skills_weight = 0.2
-            priority_weight = 0.1
-            deadline_weight = 0.1
-        elif self.optimize_for == "skills":
-            workload_weight = 0.1
-            skills_weight = 0.7  # Увеличиваем вес навыков
-            priority_weight = 0.1
-            deadline_weight = 0.1
-        elif self.optimize_for == "priority":
-            workload_weight = 0.1
-            skills_weight = 0.2
-            priority_weight = 0.6
-            deadline_weight = 0.1
-        else:  # balanced
-            workload_weight = 0.3
-            skills_weight = 0.3
-            priority_weight = 0.2
-            deadline_weight = 0.2
-        
-        # 1. Фактор загруженности (0-100)
-        workload_ratio = user.current_workload / user.workload_capacity if user.workload_capacity > 0 else 1.0
-        workload_cost = 100 * workload_ratio
-        
-        # 2. Фактор навыков (0-100)
-        skills_cost = self._calculate_skills_cost(task, user)
-        
-        # 3. Фактор приоритета (0-100)
-        priority_values = {
-            models.TaskPriority.LOW: 25,
-            models.TaskPriority.MEDIUM: 50,
-            models.TaskPriority.HIGH: 75,
-            models.TaskPriority.CRITICAL: 100
-        }
-        priority_value = priority_values.get(task.priority, 50)
-        priority_cost = 100 - (priority_value * (1 - workload_ratio))
-        
-        # 4. Фактор дедлайна (0-100)
-        deadline_cost = 50
-        if task.due_date:
-            days_until_due = (task.due_date - datetime.utcnow()).days
-            if days_until_due <= 0:
-                deadline_cost = 0
-            else:
-                deadline_cost = min(100, days_until_due * 10)
+        workload_weight, skills_weight, priority_weight, deadline_weight = self._weights
+        
+        # 1. Фактор загруженности (0-100), вектор по пользователям
+        workload_ratio = np.array([
+            user.current_workload / user.workload_capacity if user.workload_capacity > 0 else 1.0
+            for user in self.users
+        ], dtype=np.float64)
+        workload_cost = 100 * workload_ratio[None, :]
+        
+        # 2. Фактор навыков (0-100), матрица задач x пользователей
+        skills_cost = self._calculate_skills_cost_matrix()
+        
+        # 3. Фактор приоритета (0-100), вектор по задачам
+        priority_value = np.array([
+            _PRIORITY_VALUES.get(task.priority, 50) for task in self.tasks
+        ], dtype=np.float64)
+        priority_cost = 100 - priority_value[:, None] * (1 - workload_ratio[None, :])
+        
+        # 4. Фактор дедлайна (0-100), вектор по задачам
+        # Просроченные задачи -> 0, задачи без срока -> 50
+        if now is None:
+            now = datetime.utcnow()
+        days_until_due = np.array([
+            (task.due_date - now).days if task.due_date else np.nan
+            for task in self.tasks
+        ], dtype=np.float64)
+        deadline_cost = np.where(
+            np.isnan(days_until_due), 50, np.clip(days_until_due * 10, 0, 100)
+        )
         
         # Итоговая взвешенная стоимость
-        cost = (
+        return (
             workload_weight * workload_cost +
             skills_weight * skills_cost +
             priority_weight * priority_cost +
-            deadline_weight * deadline_cost
+            deadline_weight * deadline_cost[:, None]
         )
-        
-        return cost
     
-    def _calculate_skills_cost(self, task: models.Task, user: models.User) -> float:
+    def _calculate_skills_cost_matrix(self) -> np.ndarray:
         """
-        Рассчитываем стоимость на основе соответствия навыков
-        Чем больше навыков пользователя соответствует требованиям задачи, тем ниже стоимость
+        Рассчитываем стоимость на основе соответствия навыков для всех пар
+        (задача, пользователь) сразу. Чем больше навыков пользователя
+        соответствует требованиям задачи, тем ниже стоимость
+        
+        Уровни навыков (загруженные в _preload_skill_maps) раскладываются
+        в плотные матрицы задач x навыков и пользователей x навыков,
+        после чего соответствие считается через broadcasting
         """
-        # Если у задачи нет требуемых навыков, возвращаем низкую стоимость
-        if not task.required_skills:
-            return 0
-        
-        # Получаем навыки пользователя и их уровни
-        user_skills = {}
-        for skill in user.skills:
-            user_skill = self.db.query(models.user_skill).filter(
-                models.user_skill.c.user_id == user.id,
-                models.user_skill.c.skill_id == skill.id
-            ).first()
-            if user_skill:
-                user_skills[skill.id] = user_skill.level
-        
-        # Получаем требуемые навыки задачи и их уровни
-        task_skills = {}
-        for skill in task.required_skills:
-            task_skill = self.db.query(models.task_skill).filter(
-                models.task_skill.c.task_id == task.id,
-                models.task_skill.c.skill_id == skill.id
-            ).first()
-            if task_skill:
-                task_skills[skill.id] = task_skill.required_level
-        
-        # Если у задачи нет требуемых навыков после проверки, возвращаем низкую стоимость
-        if not task_skills:
-            return 0
-        
-        # Если у пользователя нет ни одного из требуемых навыков, возвращаем максимальную стоимость
-        if not any(skill_id in user_skills for skill_id in task_skills):
-            return 100
-        
-        # Рассчитываем процент соответствия навыков
-        total_match = 0
-        total_required = len(task_skills)
-        
-        for skill_id, required_level in task_skills.items():
-            if skill_id in user_skills:
-                user_level = user_skills[skill_id]
-                # Если уровень пользователя выше или равен требуемому, полное соответствие
-                if user_level >= required_level:
-                    total_match += 1
-                else:
-                    # Частичное соответствие (пропорционально уровню)
-                    match_ratio = user_level / required_level
-                    total_match += match_ratio if match_ratio <= 1 else 1
+        # Учитываем только навыки, которые требуются хотя бы одной задаче
+        skill_ids = sorted({
+            skill_id for task_skills in self._task_skill_map.values() for skill_id in task_skills
+        })
+        skill_index = {skill_id: k for k, skill_id in enumerate(skill_ids)}
+        
+        required = np.zeros((len(self.tasks), len(skill_ids)), dtype=np.float64)
+        required_mask = np.zeros(required.shape, dtype=bool)
+        for i, task in enumerate(self.tasks):
+            for skill_id, required_level in self._task_skill_map.get(task.id, {}).items():
+                required[i, skill_index[skill_id]] = required_level
+                required_mask[i, skill_index[skill_id]] = True
+        
+        levels = np.zeros((len(self.users), len(skill_ids)), dtype=np.float64)
+        levels_mask = np.zeros(levels.shape, dtype=bool)
+        for j, user in enumerate(self.users):
+            for skill_id, level in self._user_skill_map.get(user.id, {}).items():
+                if skill_id in skill_index:
+                    levels[j, skill_index[skill_id]] = level
+                    levels_mask[j, skill_index[skill_id]] = True
+        
+        # Совпавшие навыки для каждой пары: (задачи, пользователи, навыки)
+        matched = required_mask[:, None, :] & levels_mask[None, :, :]
+        
+        # Если уровень пользователя выше или равен требуемому, полное соответствие,
+        # иначе частичное (пропорционально уровню)
+        safe_required = np.where(required_mask, required, 1)
+        match_ratio = np.minimum(levels[None, :, :] / safe_required[:, None, :], 1)
+        total_match = np.where(matched, match_ratio, 0).sum(axis=2)
         
         # Процент соответствия от 0 до 1
-        match_percentage = total_match / total_required
+        total_required = required_mask.sum(axis=1)
+        match_percentage = total_match / np.maximum(total_required, 1)[:, None]
         
         # Инвертируем и масштабируем: 0% соответствия -> 100 стоимость, 100% соответствия -> 0 стоимость
         # Добавляем небольшой штраф за неполное соответствие
         base_cost = 100 * (1 - match_percentage)
-        penalty = 0 if match_percentage == 1 else 10
+        penalty = np.where(match_percentage == 1, 0, 10)
+        skills_cost = np.minimum(100, base_cost + penalty)
         
-        return min(100, base_cost + penalty)
+        # Если у пользователя нет ни одного из требуемых навыков, максимальная стоимость
+        skills_cost[~matched.any(axis=2)] = 100
+        # Если у задачи нет требуемых навыков, низкая стоимость
+        skills_cost[total_required == 0] = 0
+        
+        return skills_cost
     
-    def hungarian_algorithm(self, cost_matrix: List[List[float]]) -> List[Tuple[int, int]]:
+    def hungarian_algorithm(self, cost_matrix: np.ndarray) -> List[Tuple[int, int]]:
         """
-        Реализация венгерского алгоритма для задачи о назначениях
+        Решает задачу о назначениях венгерским алгоритмом
+        (реализация Jonker-Volgenant из scipy, работает и с прямоугольными матрицами)
         Возвращает список пар (индекс_задачи, индекс_пользователя)
         """
-        if not cost_matrix or not cost_matrix[0]:
+        # Работаем с непрерывным массивом float64, даже если передан список списков
+        cost_matrix = np.ascontiguousarray(cost_matrix, dtype=np.float64)
+        if cost_matrix.size == 0:
             return []
         
-        # Копируем матрицу, чтобы не изменять оригинал
-        matrix = [row[:] for row in cost_matrix]
-        n_tasks = len(matrix)
-        n_users = len(matrix[0])
-        
-        # Для работы алгоритма матрица должна быть квадратной
-        # Если задач больше чем пользователей, добавляем фиктивных пользователей
-        # Если пользователей больше чем задач, добавляем фиктивные задачи
-        max_dim = max(n_tasks, n_users)
-        
-        # Расширяем матрицу до квадратной
-        for i in range(n_tasks):
-            if len(matrix[i]) < max_dim:
-                matrix[i].extend([float('inf')] * (max_dim - len(matrix[i])))
-        
-        while len(matrix) < max_dim:
-            matrix.append([float('inf')] * max_dim)
-        
-        # Шаг 1: Вычитаем минимальный элемент из каждой строки
-        for i in range(max_dim):
-            min_val = min(matrix[i])
-            for j in range(max_dim):
-                matrix[i][j] -= min_val
-        
-        # Шаг 2: Вычитаем минимальный элемент из каждого столбца
-        for j in range(max_dim):
-            min_val = min(matrix[i][j] for i in range(max_dim))
-            for i in range(max_dim):
-                matrix[i][j] -= min_val
-        
-        # Шаг 3: Находим минимальное покрытие линиями всех нулей
-        # и итеративно улучшаем решение, пока не найдем оптимальное назначение
-        line_count = 0
-        row_covered = [False] * max_dim
-        col_covered = [False] * max_dim
-        
-        while line_count < max_dim:
-            # Находим минимальное покрытие нулей линиями
-            line_count = self._find_min_cover(matrix, row_covered, col_covered)
-            
-            if line_count >= max_dim:
-                break
-            
-            # Находим минимальное значение среди непокрытых элементов
-            min_val = float('inf')
-            for i in range(max_dim):
-                if not row_covered[i]:
-                    for j in range(max_dim):
-                        if not col_covered[j] and matrix[i][j] < min_val:
-                            min_val = matrix[i][j]
-            
-            # Вычитаем минимальное значение из всех непокрытых элементов
-            # и добавляем его ко всем элементам, покрытым дважды
-            for i in range(max_dim):
-                for j in range(max_dim):
-                    if not row_covered[i] and not col_covered[j]:
-                        matrix[i][j] -= min_val
-                    elif row_covered[i] and col_covered[j]:
-                        matrix[i][j] += min_val
-        
-        # Шаг 4: Находим оптимальное назначение
-        assignments = []
-        for i in range(max_dim):
-            for j in range(max_dim):
-                if matrix[i][j] == 0 and i < n_tasks and j < n_users:
-                    # Проверяем, не назначена ли уже эта задача или пользователь
-                    if not any(a[0] == i for a in assignments) and not any(a[1] == j for a in assignments):
-                        assignments.append((i, j))
-                        break
-        
-        return assignments
-    
-    def _find_min_cover(self, matrix, row_covered, col_covered):
-        """
-        Находит минимальное количество линий, покрывающих все нули в матрице
-        """
-        max_dim = len(matrix)
-        
-        # Сначала сбрасываем все покрытия
-        for i in range(max_dim):
-            row_covered[i] = False
-            col_covered[i] = False
-        
-        # Шаг 1: Отмечаем каждую строку, у которой нет отмеченного нуля
-        row_has_zero = [False] * max_dim
-        col_has_zero = [False] * max_dim
-        
-        for i in range(max_dim):
-            for j in range(max_dim):
-                if matrix[i][j] == 0:
-                    row_has_zero[i] = True
-                    col_has_zero[j] = True
-        
-        # Пока есть непокрытый ноль, отмечаем строки и столбцы
-        while True:
-            # Покрываем строки без отмеченных нулей
-            for i in range(max_dim):
-                if not row_has_zero[i]:
-                    row_covered[i] = True
-            
-            # Если все строки покрыты, выходим
-            if all(row_covered):
-                break
-            
-            # Покрываем столбцы с нулями в непокрытых строках
-            for j in range(max_dim):
-                for i in range(max_dim):
-                    if matrix[i][j] == 0 and not row_covered[i]:
-                        col_covered[j] = True
-                        break
-            
-            # Если все столбцы покрыты, выходим
-            if all(col_covered):
-                break
-            
-            # Покрываем строки, у которых есть отмеченный ноль в покрытом столбце
-            for i in range(max_dim):
-                for j in range(max_dim):
-                    if matrix[i][j] == 0 and col_covered[j]:
-                        row_covered[i] = True
-                        break
-            
-            # Если больше нечего покрывать, выходим
-            break
+        # Вырожденные случаи: одна задача или один исполнитель -
+        # оптимальное назначение это просто минимум по строке/столбцу
+        n_tasks, n_users = cost_matrix.shape
+        if n_tasks == 1:
+            return [(0, int(np.argmin(cost_matrix[0])))]
+        if n_users == 1:
+            return [(int(np.argmin(cost_matrix[:, 0])), 0)]
         
-        return sum(1 for covered in row_covered if covered) + sum(1 for covered in col_covered if covered)
+        row_ind, col_ind = linear_sum_assignment(cost_matrix)
+        return list(zip(row_ind.tolist(), col_ind.tolist()))
     
-    def optimize_assignments(self) -> List[schemas.TaskAssignmentResult]:
+    def optimize_assignments(self) -> OptimizationResult:
         """
         Основной метод, который выполняет оптимизацию назначений
-        и возвращает список результатов назначения
+        и возвращает результаты назначения вместе с незназначенными задачами
         """
         if not self.tasks or not self.users:
-            return []
+            return OptimizationResult([], [task.id for task in self.tasks])
         
-        # Рассчитываем матрицу стоимости
-        cost_matrix = self.calculate_cost_matrix()
+        # Рассчитываем матрицу стоимости; время фиксируем один раз на весь запуск
+        now = datetime.utcnow()
+        cost_matrix = self.calculate_cost_matrix(now)
         
         # Применяем венгерский алгоритм для поиска оптимальных назначений
         assignments = self.hungarian_algorithm(cost_matrix)
@@ -352,41 +256,68 @@ class TaskAssignmentOptimizer:
         result = []
         unassigned_tasks = []
         
-        for task_idx, user_idx in assignments:
-            if task_idx < len(self.tasks) and user_idx < len(self.users):
-                task = self.tasks[task_idx]
-                user = self.users[user_idx]
-                
-                # Вычисляем оценку соответствия (инвертируем стоимость)
-                match_score = 100 - min(100, cost_matrix[task_idx][user_idx])
-                
-                result.append(schemas.TaskAssignmentResult(
-                    task_id=task.id,
-                    assignee_id=user.id,
-                    assignee_username=user.username,
-                    match_score=match_score
-                ))
-                
-                # Применяем назначение в БД, если это не фиктивное назначение
-                self._apply_assignment(task.id, user.id)
+        if assignments:
+            task_indices, user_indices = np.array(assignments).T
+            # Вычисляем оценки соответствия (инвертируем стоимость) одной операцией
+            match_scores = 100 - np.minimum(100, cost_matrix[task_indices, user_indices])
+        else:
+            match_scores = []
+        
+        assigned_pairs = []
+        for (task_idx, user_idx), match_score in zip(assignments, match_scores):
+            task = self.tasks[task_idx]
+            user = self.users[user_idx]
+            
+            result.append(schemas.TaskAssignmentResult(
+                task_id=task.id,
+                assignee_id=user.id,
+                assignee_username=user.username,
+                match_score=float(match_score)
+            ))
+            assigned_pairs.append((task, user))
             
         # Проверяем незназначенные задачи
-        assigned_task_indices = [i for i, _ in assignments]
+        assigned_task_indices = {i for i, _ in assignments}
         for i, task in enumerate(self.tasks):
             if i not in assigned_task_indices:
                 unassigned_tasks.append(task.id)
         
-        return result, unassigned_tasks
+        # Применяем все назначения в БД одним пакетом
+        self._apply_assignments(assigned_pairs)
+        
+        return OptimizationResult(result, unassigned_tasks)
     
-    def _apply_assignment(self, task_id: int, user_id: int):
+    def _apply_assignments(self, assigned_pairs: List[Tuple[models.Task, models.User]]):
         """
-        Применяет назначение задачи пользователю в БД
+        Применяет назначения задач пользователям в БД: исполнители задач
+        и загрузка пользователей обновляются пакетными UPDATE с одним коммитом
         """
-        # Обновляем задачу
-        task_update = schemas.TaskUpdate(assignee_id=user_id)
-        updated_task = crud.update_task(self.db, task_id, task_update)
+        if not assigned_pairs:
+            return
+        
+        # Обновляем исполнителей задач
+        tasks_table = models.Task.__table__
+        self.db.execute(
+            update(tasks_table)
+            .where(tasks_table.c.id == bindparam("b_task_id"))
+            .values(assignee_id=bindparam("b_assignee_id")),
+            [{"b_task_id": task.id, "b_assignee_id": user.id} for task, user in assigned_pairs]
+        )
+        
+        # Увеличиваем загрузку исполнителей на суммарную оценку назначенных задач
+        workload_delta: Dict[int, float] = {}
+        for task, user in assigned_pairs:
+            workload_delta[user.id] = workload_delta.get(user.id, 0.0) + task.estimated_hours
+        
+        users_table = models.User.__table__
+        self.db.execute(
+            update(users_table)
+            .where(users_table.c.id == bindparam("b_user_id"))
+            .values(current_workload=users_table.c.current_workload + bindparam("b_hours")),
+            [{"b_user_id": user_id, "b_hours": hours} for user_id, hours in workload_delta.items()]
+        )
         
-        return updated_task
+        self.db.commit()
 
 
 def assign_tasks(db: Session, project_id: int, optimize_for: str = "balanced") -> schemas.AutoAssignmentResponse:
@@ -401,13 +332,17 @@ def assign_tasks(db: Session, project_id: int, optimize_for: str = "balanced") -
     Returns:
         AutoAssignmentResponse: Assignment results
     """
-    # Get project
-    project = crud.get_project(db, project_id)
+    # Get project with members and their skills eagerly loaded
+    project = db.query(models.Project).options(
+        selectinload(models.Project.members).selectinload(models.User.skills)
+    ).filter(models.Project.id == project_id).first()
     if not project:
-        raise ValueError(f"Project with id {project_id} not found")
+        raise ProjectNotFoundError(f"Project with id {project_id} not found")
     
-    # Get unassigned tasks in the project
-    tasks = db.query(models.Task).filter(
+    # Get unassigned tasks in the project along with their required skills
+    tasks = db.query(models.Task).options(
+        selectinload(models.Task.required_skills)
+    ).filter(
         models.Task.project_id == project_id,
         models.Task.status == models.TaskStatus.TODO,
         models.Task.assignee_id.is_(None)
@@ -436,27 +371,20 @@ def assign_tasks(db: Session, project_id: int, optimize_for: str = "balanced") -
         assignments = []
         unassigned_tasks = []
         
+        # Precompute skill id sets once instead of walking relationships per pair
+        user_skill_ids = {user.id: frozenset(skill.id for skill in user.skills) for user in users}
+        task_skill_ids = {task.id: frozenset(skill.id for skill in task.required_skills) for task in tasks}
+        
         # Get tasks with required skills
         for task in tasks:
             assigned = False
+            required = task_skill_ids[task.id]
             
             # Try to find a user with matching skills
             for user in users:
-                # If the user has any of the required skills for the task, assign it
-                user_has_skill = False
-                
-                if task.required_skills:
-                    for skill in task.required_skills:
-                        # Check if user has this skill
-                        for user_skill in user.skills:
-                            if user_skill.id == skill.id:
-                                user_has_skill = True
-                                break
-                        if user_has_skill:
-                            break
-                else:
-                    # If task has no required skills, any user can do it
-                    user_has_skill = True
+                # If the user has any of the required skills for the task, assign it.
+                # If task has no required skills, any user can do it
+                user_has_skill = not required or not required.isdisjoint(user_skill_ids[user.id])
                 
                 if user_has_skill:
                     # Create assignment
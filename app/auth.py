@@ -5,7 +5,11 @@
 """
 
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
+import hashlib
+import threading
+import time
+from cachetools import TTLCache
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
@@ -26,14 +30,40 @@ load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Стоимость bcrypt; в тестах понижается через переменную окружения
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=BCRYPT_ROUNDS, deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="users/token")
 
+# Хеш для проверки при входе несуществующего пользователя: bcrypt выполняется
+# в любом случае, и по времени ответа нельзя узнать, существует ли имя
+DUMMY_PASSWORD_HASH = pwd_context.hash("dummy-password")
+
+# Кэш успешных проверок паролей, чтобы не повторять bcrypt для тех же учетных данных.
+# Пароль в открытом виде не хранится: ключом служит его хеш BLAKE2 с SECRET_KEY
+# вместе с bcrypt-хешем из БД, поэтому после смены пароля старые записи не совпадают.
+_verified_passwords: TTLCache = TTLCache(maxsize=1024, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+_verified_passwords_lock = threading.Lock()
+
+# Кэш декодированных JWT токенов: токен неизменяем до истечения срока действия,
+# поэтому повторная проверка подписи для него не нужна
+_decoded_tokens: TTLCache = TTLCache(maxsize=10_000, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+_decoded_tokens_lock = threading.Lock()
+
+def _password_cache_key(plain_password: str, hashed_password: str) -> Tuple[str, str]:
+    digest = hashlib.blake2b(
+        plain_password.encode(), key=SECRET_KEY.encode()[:64], digest_size=16
+    ).hexdigest()
+    return digest, hashed_password
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Проверяет соответствие введенного пароля хешированному.
     
+    Успешные проверки кэшируются на время жизни токена, неуспешные
+    всегда проходят полную проверку bcrypt.
+    
     Args:
         plain_password: Введенный пароль в открытом виде
         hashed_password: Хешированный пароль из базы данных
@@ -41,7 +71,16 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         bool: True если пароль соответствует, иначе False
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    cache_key = _password_cache_key(plain_password, hashed_password)
+    with _verified_passwords_lock:
+        if cache_key in _verified_passwords:
+            return True
+    
+    verified = pwd_context.verify(plain_password, hashed_password)
+    if verified:
+        with _verified_passwords_lock:
+            _verified_passwords[cache_key] = True
+    return verified
 
 def get_password_hash(password: str) -> str:
     """
@@ -122,6 +161,12 @@ def decode_access_token(token: str) -> TokenData:
     Raises:
         HTTPException: Если токен невалидный
     """
+    with _decoded_tokens_lock:
+        cached = _decoded_tokens.get(token)
+    # Токен из кэша используется только до истечения его собственного срока действия
+    if cached is not None and cached[1] > time.time():
+        return cached[0]
+    
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
@@ -132,6 +177,9 @@ def decode_access_token(token: str) -> TokenData:
                 headers={"WWW-Authenticate": "Bearer"},
             )
         token_data = TokenData(username=username)
+        if payload.get("exp") is not None:
+            with _decoded_tokens_lock:
+                _decoded_tokens[token] = (token_data, payload["exp"])
         return token_data
     except JWTError:
         raise HTTPException(
@@ -140,7 +188,9 @@ def decode_access_token(token: str) -> TokenData:
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+# Синхронная зависимость: FastAPI выполняет ее в пуле потоков, поэтому запрос к БД
+# не блокирует цикл событий
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
     """
     Получает текущего пользователя на основе JWT токена.
     
@@ -1,8 +1,10 @@
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 from datetime import datetime
 
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import and_, case, delete, exists, func, or_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 
 from . import models, schemas, auth
 
@@ -11,10 +13,25 @@ CRUD operations module.
 This module provides Create, Read, Update, Delete operations for all models.
 """
 
+def _insert(db: Session, table):
+    """
+    INSERT с поддержкой ON CONFLICT для диалекта текущего подключения
+    (SQLite по умолчанию, PostgreSQL в docker-compose)
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
 # CRUD для пользователей
 def get_user(db: Session, user_id: int):
     """Get user by ID."""
-    return db.query(models.User).filter(models.User.id == user_id).first()
+    return db.get(models.User, user_id)
+
+def get_user_with_skills(db: Session, user_id: int) -> Optional[models.User]:
+    """Get user by ID with skills loaded in the same query (for UserWithSkills responses)."""
+    return db.query(models.User).options(
+        joinedload(models.User.skills)
+    ).filter(models.User.id == user_id).one_or_none()
 
 def get_user_by_email(db: Session, email: str) -> Optional[models.User]:
     """
@@ -27,7 +44,7 @@ def get_user_by_email(db: Session, email: str) -> Optional[models.User]:
     Returns:
         Optional[User]: User if found, None otherwise
     """
-    return db.query(models.User).filter(models.User.email.ilike(email)).first()
+    return db.query(models.User).filter(func.lower(models.User.email) == func.lower(email)).first()
 
 def get_user_by_username(db: Session, username: str) -> Optional[models.User]:
     """
@@ -40,22 +57,53 @@ def get_user_by_username(db: Session, username: str) -> Optional[models.User]:
     Returns:
         Optional[User]: User if found, None otherwise
     """
-    return db.query(models.User).filter(models.User.username.ilike(username)).first()
+    return db.query(models.User).filter(func.lower(models.User.username) == func.lower(username)).first()
+
+def get_login_credentials(db: Session, username: str) -> Optional[Tuple[str, str]]:
+    """
+    Get the stored username and password hash for a login attempt.
+    
+    Only the two columns are selected, so no User object is loaded.
+    
+    Args:
+        db: Database session
+        username: Username to search for (case-insensitive)
+        
+    Returns:
+        Optional[Tuple[str, str]]: (username, hashed_password) if found, None otherwise
+    """
+    row = db.query(models.User.username, models.User.hashed_password).filter(
+        func.lower(models.User.username) == func.lower(username)
+    ).first()
+    return tuple(row) if row else None
+
+def get_user_by_username_or_email(db: Session, username: str, email: str) -> Optional[models.User]:
+    """
+    Get a user whose username or email matches (case-insensitive) in a single query.
+    
+    Args:
+        db: Database session
+        username: Username to search for
+        email: Email to search for
+        
+    Returns:
+        Optional[User]: Conflicting user if found, None otherwise
+    """
+    return db.query(models.User).filter(
+        or_(
+            func.lower(models.User.username) == func.lower(username),
+            func.lower(models.User.email) == func.lower(email)
+        )
+    ).first()
 
 def get_users(db: Session, skip: int = 0, limit: int = 100):
     """Get list of users with pagination."""
     return db.query(models.User).offset(skip).limit(limit).all()
 
 def create_user(db: Session, user: schemas.UserCreate):
-    """Create a new user."""
-    # Check for existing username
-    existing_user = get_user_by_username(db, user.username)
-    if existing_user:
-        return None
-    
-    # Check for existing email
-    existing_email = get_user_by_email(db, user.email)
-    if existing_email:
+    """Create a new user; returns None if the username or email is taken."""
+    # Check for existing username or email before spending time on bcrypt
+    if get_user_by_username_or_email(db, user.username, user.email):
         return None
     
     # Create new user
@@ -68,29 +116,51 @@ def create_user(db: Session, user: schemas.UserCreate):
         current_workload=0.0
     )
     db.add(db_user)
-    db.commit()
+    # The unique indexes still reject a duplicate inserted concurrently
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return None
     db.refresh(db_user)
     return db_user
 
 def update_user(db: Session, user_id: int, user: schemas.UserUpdate):
-    db_user = db.query(models.User).filter(models.User.id == user_id).first()
-    if not db_user:
-        return None
-
     update_data = user.model_dump(exclude_unset=True)
+    if not update_data:
+        return db.get(models.User, user_id)
     
+    # Строка обновляется, только если хотя бы одно значение отличается от текущего;
+    # новый пароль сравнить нельзя (хеш каждый раз разный), поэтому он всегда записывается
     if "password" in update_data:
         update_data["hashed_password"] = auth.get_password_hash(update_data.pop("password"))
-    
-    for key, value in update_data.items():
-        setattr(db_user, key, value)
+        changed = []
+    else:
+        changed = [
+            getattr(models.User, key).is_distinct_from(value) for key, value in update_data.items()
+        ]
+    
+    # Один UPDATE ... RETURNING вместо SELECT перед изменением
+    stmt = update(models.User).where(models.User.id == user_id)
+    if changed:
+        stmt = stmt.where(or_(*changed))
+    try:
+        db_user = db.execute(stmt.values(**update_data).returning(models.User)).scalar_one_or_none()
+    except IntegrityError:
+        # Имя или email уже заняты (уникальные индексы без учета регистра);
+        # откатываем транзакцию и передаем ошибку вызывающему коду
+        db.rollback()
+        raise
+    if db_user is None:
+        # Либо пользователя нет (None), либо изменять было нечего
+        db.rollback()
+        return db.get(models.User, user_id)
     
     db.commit()
-    db.refresh(db_user)
     return db_user
 
 def delete_user(db: Session, user_id: int):
-    db_user = db.query(models.User).filter(models.User.id == user_id).first()
+    db_user = db.get(models.User, user_id)
     if db_user:
         db.delete(db_user)
         db.commit()
@@ -99,7 +169,7 @@ def delete_user(db: Session, user_id: int):
 
 # CRUD для навыков
 def get_skill(db: Session, skill_id: int):
-    return db.query(models.Skill).filter(models.Skill.id == skill_id).first()
+    return db.get(models.Skill, skill_id)
 
 def get_skill_by_name(db: Session, name: str):
     return db.query(models.Skill).filter(models.Skill.name == name).first()
@@ -114,63 +184,55 @@ def create_skill(db: Session, skill: schemas.SkillCreate):
     db.refresh(db_skill)
     return db_skill
 
+def update_skill(db: Session, skill_id: int, skill: schemas.SkillCreate) -> bool:
+    """
+    Обновляет навык одним UPDATE; возвращает False, если навык не найден
+    """
+    result = db.execute(
+        update(models.Skill).where(models.Skill.id == skill_id).values(**skill.model_dump())
+    )
+    db.commit()
+    return result.rowcount > 0
+
 def delete_skill(db: Session, skill_id: int):
-    db_skill = db.query(models.Skill).filter(models.Skill.id == skill_id).first()
-    if db_skill:
-        db.delete(db_skill)
-        db.commit()
-        return True
-    return False
+    # Удаляем связи и сам навык без предварительной загрузки навыка и его коллекций
+    db.execute(models.user_skill.delete().where(models.user_skill.c.skill_id == skill_id))
+    db.execute(models.task_skill.delete().where(models.task_skill.c.skill_id == skill_id))
+    # ORM-вариант DELETE также убирает удаленный объект из сессии
+    result = db.execute(delete(models.Skill).where(models.Skill.id == skill_id))
+    db.commit()
+    return result.rowcount > 0
 
 # Управление навыками пользователя
+def check_user_and_skill_exist(db: Session, user_id: int, skill_id: int) -> Tuple[bool, bool]:
+    """
+    Возвращает (пользователь существует, навык существует) одним запросом
+    """
+    user_exists, skill_exists = db.query(
+        exists().where(models.User.id == user_id),
+        exists().where(models.Skill.id == skill_id)
+    ).one()
+    return user_exists, skill_exists
+
 def add_skill_to_user(db: Session, user_id: int, skill_id: int, level: int = 1):
-    db_user = db.query(models.User).filter(models.User.id == user_id).first()
-    db_skill = db.query(models.Skill).filter(models.Skill.id == skill_id).first()
-    
-    if not db_user or not db_skill:
+    user_exists, skill_exists = check_user_and_skill_exist(db, user_id, skill_id)
+    if not user_exists or not skill_exists:
         return None
     
-    # Проверка, есть ли уже такой навык у пользователя
-    stmt = db.query(models.user_skill).filter(
-        and_(
-            models.user_skill.c.user_id == user_id,
-            models.user_skill.c.skill_id == skill_id
-        )
-    ).first()
-    
-    if stmt:
-        # Обновляем уровень навыка
-        db.execute(
-            models.user_skill.update()
-            .where(
-                and_(
-                    models.user_skill.c.user_id == user_id,
-                    models.user_skill.c.skill_id == skill_id
-                )
-            )
-            .values(level=level)
-        )
-    else:
-        # Добавляем новый навык
-        db.execute(
-            models.user_skill.insert().values(
-                user_id=user_id,
-                skill_id=skill_id,
-                level=level
-            )
-        )
+    # Добавляем навык или обновляем уровень, если он уже есть у пользователя
+    db.execute(
+        _insert(db, models.user_skill)
+        .values(user_id=user_id, skill_id=skill_id, level=level)
+        .on_conflict_do_update(index_elements=["user_id", "skill_id"], set_={"level": level})
+    )
     
     db.commit()
-    return db_user
+    return db.get(models.User, user_id)
 
 def remove_skill_from_user(db: Session, user_id: int, skill_id: int):
-    db_user = db.query(models.User).filter(models.User.id == user_id).first()
-    db_skill = db.query(models.Skill).filter(models.Skill.id == skill_id).first()
-    
-    if not db_user or not db_skill:
-        return None
-    
-    db.execute(
+    # Удаляем связь без предварительных SELECT; если строк не было,
+    # проверяем, существует ли навык, чтобы вернуть None для неизвестного ID
+    result = db.execute(
         models.user_skill.delete()
         .where(
             and_(
@@ -179,50 +241,31 @@ def remove_skill_from_user(db: Session, user_id: int, skill_id: int):
             )
         )
     )
-    
     db.commit()
-    return db_user
+    
+    if result.rowcount == 0 and db.get(models.Skill, skill_id) is None:
+        return None
+    return db.get(models.User, user_id)
 
 # Управление навыками задач
 def add_skill_to_task(db: Session, task_id: int, skill_id: int, required_level: int = 1):
     """
     Добавляет навык к задаче или обновляет требуемый уровень
     """
-    db_task = db.query(models.Task).filter(models.Task.id == task_id).first()
-    db_skill = db.query(models.Skill).filter(models.Skill.id == skill_id).first()
+    db_task = db.get(models.Task, task_id)
+    db_skill = db.get(models.Skill, skill_id)
     
     if not db_task or not db_skill:
         return None
     
-    # Проверка, есть ли уже такой навык у задачи
-    stmt = db.query(models.task_skill).filter(
-        and_(
-            models.task_skill.c.task_id == task_id,
-            models.task_skill.c.skill_id == skill_id
-        )
-    ).first()
-    
-    if stmt:
-        # Обновляем требуемый уровень навыка
-        db.execute(
-            models.task_skill.update()
-            .where(
-                and_(
-                    models.task_skill.c.task_id == task_id,
-                    models.task_skill.c.skill_id == skill_id
-                )
-            )
-            .values(required_level=required_level)
-        )
-    else:
-        # Добавляем новый навык
-        db.execute(
-            models.task_skill.insert().values(
-                task_id=task_id,
-                skill_id=skill_id,
-                required_level=required_level
-            )
+    # Добавляем навык или обновляем требуемый уровень, если он уже есть у задачи
+    db.execute(
+        _insert(db, models.task_skill)
+        .values(task_id=task_id, skill_id=skill_id, required_level=required_level)
+        .on_conflict_do_update(
+            index_elements=["task_id", "skill_id"], set_={"required_level": required_level}
         )
+    )
     
     db.commit()
     return db_task
@@ -231,13 +274,7 @@ def remove_skill_from_task(db: Session, task_id: int, skill_id: int):
     """
     Удаляет навык из задачи
     """
-    db_task = db.query(models.Task).filter(models.Task.id == task_id).first()
-    db_skill = db.query(models.Skill).filter(models.Skill.id == skill_id).first()
-    
-    if not db_task or not db_skill:
-        return None
-    
-    db.execute(
+    result = db.execute(
         models.task_skill.delete()
         .where(
             and_(
@@ -246,19 +283,56 @@ def remove_skill_from_task(db: Session, task_id: int, skill_id: int):
             )
         )
     )
-    
     db.commit()
-    return db_task
+    
+    if result.rowcount == 0 and db.get(models.Skill, skill_id) is None:
+        return None
+    return db.get(models.Task, task_id)
 
 # CRUD для проектов
 def get_project(db: Session, project_id: int):
-    return db.query(models.Project).filter(models.Project.id == project_id).first()
+    return db.get(models.Project, project_id)
+
+def get_project_with_members(db: Session, project_id: int):
+    """
+    Возвращает проект вместе с участниками одним запросом (для проверки прав доступа)
+    """
+    return db.query(models.Project).options(
+        joinedload(models.Project.members)
+    ).filter(models.Project.id == project_id).one_or_none()
+
+def _membership_clause(project_id: int, user_id: int):
+    return exists().where(
+        and_(
+            models.project_user.c.project_id == project_id,
+            models.project_user.c.user_id == user_id
+        )
+    )
+
+def user_is_project_member(db: Session, project_id: int, user_id: int) -> bool:
+    """
+    Проверяет участие пользователя в проекте одним EXISTS-запросом по project_user
+    """
+    return db.query(_membership_clause(project_id, user_id)).scalar()
+
+def get_project_membership(db: Session, project_id: int, user_id: int) -> Tuple[bool, bool]:
+    """
+    Возвращает (проект существует, пользователь участник проекта) одним запросом
+    """
+    project_exists, is_member = db.query(
+        exists().where(models.Project.id == project_id),
+        _membership_clause(project_id, user_id)
+    ).one()
+    return project_exists, is_member
 
 def get_project_by_name(db: Session, name: str):
     return db.query(models.Project).filter(models.Project.name == name).first()
 
 def get_projects(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Project).offset(skip).limit(limit).all()
+    # Участники сериализуются в ответе, поэтому загружаем их одним запросом на всю страницу
+    return db.query(models.Project).options(
+        selectinload(models.Project.members)
+    ).offset(skip).limit(limit).all()
 
 def create_project(db: Session, project: schemas.ProjectCreate):
     db_project = models.Project(**project.model_dump())
@@ -268,7 +342,7 @@ def create_project(db: Session, project: schemas.ProjectCreate):
     return db_project
 
 def update_project(db: Session, project_id: int, project: schemas.ProjectUpdate):
-    db_project = db.query(models.Project).filter(models.Project.id == project_id).first()
+    db_project = db.get(models.Project, project_id)
     if not db_project:
         return None
 
@@ -281,7 +355,7 @@ def update_project(db: Session, project_id: int, project: schemas.ProjectUpdate)
     return db_project
 
 def delete_project(db: Session, project_id: int):
-    db_project = db.query(models.Project).filter(models.Project.id == project_id).first()
+    db_project = db.get(models.Project, project_id)
     if db_project:
         db.delete(db_project)
         db.commit()
@@ -290,40 +364,24 @@ def delete_project(db: Session, project_id: int):
 
 # Управление участниками проекта
 def add_user_to_project(db: Session, project_id: int, user_id: int):
-    db_project = db.query(models.Project).filter(models.Project.id == project_id).first()
-    db_user = db.query(models.User).filter(models.User.id == user_id).first()
+    db_project = db.get(models.Project, project_id)
+    db_user = db.get(models.User, user_id)
     
     if not db_project or not db_user:
         return None
     
-    # Проверка, есть ли уже пользователь в проекте
-    stmt = db.query(models.project_user).filter(
-        and_(
-            models.project_user.c.project_id == project_id,
-            models.project_user.c.user_id == user_id
-        )
-    ).first()
-    
-    if not stmt:
-        db.execute(
-            models.project_user.insert().values(
-                project_id=project_id,
-                user_id=user_id
-            )
-        )
-        
-        db.commit()
+    # Добавляем пользователя в проект; повторное добавление ничего не меняет
+    db.execute(
+        _insert(db, models.project_user)
+        .values(project_id=project_id, user_id=user_id)
+        .on_conflict_do_nothing(index_elements=["project_id", "user_id"])
+    )
+    db.commit()
     
     return db_project
 
 def remove_user_from_project(db: Session, project_id: int, user_id: int):
-    db_project = db.query(models.Project).filter(models.Project.id == project_id).first()
-    db_user = db.query(models.User).filter(models.User.id == user_id).first()
-    
-    if not db_project or not db_user:
-        return None
-    
-    db.execute(
+    result = db.execute(
         models.project_user.delete()
         .where(
             and_(
@@ -332,51 +390,103 @@ def remove_user_from_project(db: Session, project_id: int, user_id: int):
             )
         )
     )
-    
     db.commit()
-    return db_project
+    
+    if result.rowcount == 0 and db.get(models.User, user_id) is None:
+        return None
+    return db.get(models.Project, project_id)
 
 # CRUD для задач
 def get_task(db: Session, task_id: int):
-    return db.query(models.Task).filter(models.Task.id == task_id).first()
+    return db.get(models.Task, task_id)
+
+def _tasks_query(db: Session):
+    # Требуемые навыки сериализуются в ответе, поэтому загружаем их одним запросом на всю выборку
+    return db.query(models.Task).options(selectinload(models.Task.required_skills))
 
 def get_tasks(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Task).offset(skip).limit(limit).all()
+    return _tasks_query(db).offset(skip).limit(limit).all()
+
+def _project_tasks_query(db: Session, project_id: int):
+    return _tasks_query(db).filter(models.Task.project_id == project_id)
+
+def _visible_tasks_query(db: Session, user_id: int):
+    return _tasks_query(db).join(
+        models.project_user, models.Task.project_id == models.project_user.c.project_id
+    ).filter(models.project_user.c.user_id == user_id).order_by(models.Task.id)
 
 def get_project_tasks(db: Session, project_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.Task).filter(models.Task.project_id == project_id).offset(skip).limit(limit).all()
+    return _project_tasks_query(db, project_id).offset(skip).limit(limit).all()
+
+def get_tasks_visible_to_user(db: Session, user_id: int, skip: int = 0, limit: int = 100):
+    """
+    Задачи всех проектов, в которых участвует пользователь, с пагинацией на стороне БД
+    """
+    return _visible_tasks_query(db, user_id).offset(skip).limit(limit).all()
+
+def iter_tasks(db: Session, user_id: int, project_id: Optional[int] = None,
+               skip: int = 0, limit: int = 100, batch_size: int = 64) -> Iterator[models.Task]:
+    """
+    Задачи проекта (если указан project_id) или всех проектов пользователя,
+    выбираемые из БД партиями по batch_size строк: в памяти одновременно одна партия
+    """
+    query = _project_tasks_query(db, project_id) if project_id else _visible_tasks_query(db, user_id)
+    yield from query.offset(skip).limit(limit).yield_per(batch_size)
 
 def get_user_tasks(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.Task).filter(models.Task.assignee_id == user_id).offset(skip).limit(limit).all()
+    return _tasks_query(db).filter(models.Task.assignee_id == user_id).offset(skip).limit(limit).all()
 
 def create_task(db: Session, task: schemas.TaskCreate):
     task_data = task.model_dump(exclude={"required_skills"})
     db_task = models.Task(**task_data)
     db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
+    # flush выдает id задачи; задача и ее навыки сохраняются одним коммитом
+    db.flush()
     
     # Добавляем требуемые навыки к задаче
     if task.required_skills:
-        for skill_id in task.required_skills:
-            db_skill = db.query(models.Skill).filter(models.Skill.id == skill_id).first()
-            if db_skill:
-                db.execute(
-                    models.task_skill.insert().values(
-                        task_id=db_task.id,
-                        skill_id=skill_id,
-                        required_level=1  # По умолчанию уровень 1
-                    )
-                )
-        db.commit()
+        _insert_task_skills(db, db_task.id, task.required_skills)
     
+    db.commit()
+    db.refresh(db_task)
     return db_task
 
+def _insert_task_skills(db: Session, task_id: int, skill_ids: List[int]) -> None:
+    """
+    Привязывает к задаче существующие навыки из списка с уровнем 1 по умолчанию:
+    один SELECT для проверки навыков и один пакетный INSERT
+    """
+    existing_ids = {
+        row.id for row in db.query(models.Skill.id).filter(models.Skill.id.in_(skill_ids)).all()
+    }
+    rows = [
+        {"task_id": task_id, "skill_id": skill_id, "required_level": 1}
+        for skill_id in dict.fromkeys(skill_ids)
+        if skill_id in existing_ids
+    ]
+    if rows:
+        db.execute(models.task_skill.insert(), rows)
+
+def _change_workload(db: Session, user_id: int, delta: float) -> None:
+    """
+    Изменяет загрузку пользователя на delta одним UPDATE на стороне БД,
+    не опускаясь ниже нуля. Изменения видны после commit
+    """
+    users_table = models.User.__table__
+    new_workload = users_table.c.current_workload + delta
+    db.execute(
+        users_table.update()
+        .where(users_table.c.id == user_id)
+        .values(current_workload=case((new_workload < 0, 0.0), else_=new_workload))
+    )
+
 def update_task(db: Session, task_id: int, task: schemas.TaskUpdate):
     """Update task by ID."""
-    db_task = db.query(models.Task).filter(models.Task.id == task_id).first()
+    db_task = db.get(models.Task, task_id)
     if not db_task:
         return None
+    
+    prev_assignee_id = db_task.assignee_id
 
     # Обновляем поля задачи
     update_data = task.model_dump(exclude={"required_skills"}, exclude_unset=True)
@@ -384,16 +494,12 @@ def update_task(db: Session, task_id: int, task: schemas.TaskUpdate):
         setattr(db_task, key, value)
     
     # Если изменился исполнитель, обновляем workload
-    if "assignee_id" in update_data:
-        if db_task.assignee_id:  # Если был предыдущий исполнитель
-            prev_assignee = db.query(models.User).filter(models.User.id == db_task.assignee_id).first()
-            if prev_assignee:
-                prev_assignee.current_workload = max(prev_assignee.current_workload - db_task.estimated_hours, 0)
+    if "assignee_id" in update_data and update_data["assignee_id"] != prev_assignee_id:
+        if prev_assignee_id:  # Если был предыдущий исполнитель
+            _change_workload(db, prev_assignee_id, -db_task.estimated_hours)
         
         if update_data["assignee_id"]:  # Если назначен новый исполнитель
-            new_assignee = db.query(models.User).filter(models.User.id == update_data["assignee_id"]).first()
-            if new_assignee:
-                new_assignee.current_workload += db_task.estimated_hours
+            _change_workload(db, update_data["assignee_id"], db_task.estimated_hours)
     
     # Обновляем навыки, если они предоставлены
     if task.required_skills is not None:
@@ -404,16 +510,8 @@ def update_task(db: Session, task_id: int, task: schemas.TaskUpdate):
         )
         
         # Добавляем новые навыки
-        for skill_id in task.required_skills:
-            db_skill = db.query(models.Skill).filter(models.Skill.id == skill_id).first()
-            if db_skill:
-                db.execute(
-                    models.task_skill.insert().values(
-                        task_id=task_id,
-                        skill_id=skill_id,
-                        required_level=1
-                    )
-                )
+        if task.required_skills:
+            _insert_task_skills(db, task_id, task.required_skills)
     
     db.commit()
     db.refresh(db_task)
@@ -423,39 +521,49 @@ def update_task_status(db: Session, task_id: int, status: models.TaskStatus):
     """
     Обновляет статус задачи и устанавливает completed_at для завершенных задач
     """
-    db_task = db.query(models.Task).filter(models.Task.id == task_id).first()
-    if not db_task:
-        return None
+    tasks_table = models.Task.__table__
+    values = {"status": status}
     
-    # Устанавливаем новый статус
-    db_task.status = status
+    # Если статус DONE, устанавливаем дату завершения, не перезаписывая уже заданную
+    if status == models.TaskStatus.DONE:
+        values["completed_at"] = func.coalesce(tasks_table.c.completed_at, datetime.utcnow())
     
-    # Если статус DONE, устанавливаем дату завершения
-    if status == models.TaskStatus.DONE and not db_task.completed_at:
-        db_task.completed_at = datetime.utcnow()
+    # Одно UPDATE без предварительного чтения задачи
+    result = db.execute(
+        tasks_table.update().where(tasks_table.c.id == task_id).values(**values)
+    )
+    if result.rowcount == 0:
+        # Задачи нет: закрываем открытую UPDATE транзакцию
+        db.rollback()
+        return None
     
     db.commit()
-    db.refresh(db_task)
-    return db_task
+    return db.get(models.Task, task_id)
 
 def delete_task(db: Session, task_id: int):
     """Delete task by ID."""
-    db_task = db.query(models.Task).filter(models.Task.id == task_id).first()
-    if db_task:
-        # Уменьшаем workload пользователя, если задача была назначена
-        if db_task.assignee_id:
-            assignee = db.query(models.User).filter(models.User.id == db_task.assignee_id).first()
-            if assignee:
-                assignee.current_workload = max(assignee.current_workload - db_task.estimated_hours, 0)
-        
-        db.delete(db_task)
-        db.commit()
-        return True
-    return False
+    db.execute(models.task_skill.delete().where(models.task_skill.c.task_id == task_id))
+    
+    # RETURNING отдает исполнителя и оценку удаленной задачи без отдельного SELECT
+    deleted = db.execute(
+        delete(models.Task)
+        .where(models.Task.id == task_id)
+        .returning(models.Task.assignee_id, models.Task.estimated_hours)
+    ).first()
+    if deleted is None:
+        db.rollback()
+        return False
+    
+    # Уменьшаем workload пользователя, если задача была назначена
+    if deleted.assignee_id:
+        _change_workload(db, deleted.assignee_id, -deleted.estimated_hours)
+    
+    db.commit()
+    return True
 
 def update_assignee_workload(db: Session, assignee: models.User, task: models.Task) -> None:
     """Update assignee workload after task assignment."""
-    assignee.current_workload = max(assignee.current_workload - task.estimated_hours, 0)
+    _change_workload(db, assignee.id, -task.estimated_hours)
     db.commit()
 
 def get_user_skills(db: Session, user_id: int):
@@ -466,9 +574,11 @@ def get_user_skills(db: Session, user_id: int):
         user_id: ID of the user
         
     Returns:
-        List of user_skill association items
+        List of user_skill association items with the joined skill_name
     """
-    return db.query(models.user_skill).filter(models.user_skill.c.user_id == user_id).all()
+    return db.query(models.user_skill, models.Skill.name.label("skill_name")).join(
+        models.Skill, models.Skill.id == models.user_skill.c.skill_id
+    ).filter(models.user_skill.c.user_id == user_id).all()
 
 def get_task_skills(db: Session, task_id: int):
     """Get all skills required for a task with required levels.
@@ -478,6 +588,8 @@ def get_task_skills(db: Session, task_id: int):
         task_id: ID of the task
         
     Returns:
-        List of task_skill association items
+        List of task_skill association items with the joined skill_name
     """
-    return db.query(models.task_skill).filter(models.task_skill.c.task_id == task_id).all() 
\ No newline at end of file
+    return db.query(models.task_skill, models.Skill.name.label("skill_name")).join(
+        models.Skill, models.Skill.id == models.task_skill.c.skill_id
+    ).filter(models.task_skill.c.task_id == task_id).all() 
\ No newline at end of file
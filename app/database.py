@@ -6,7 +6,7 @@
 """
 
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
@@ -20,7 +20,48 @@ DATABASE_URL = os.getenv(
 )
 
 # Создаем движок SQLAlchemy
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+_is_sqlite = DATABASE_URL.startswith("sqlite")
+_is_sqlite_memory = _is_sqlite and (":memory:" in DATABASE_URL or DATABASE_URL.rstrip("/") == "sqlite:")
+
+# Размер пула соединений (QueuePool) и число соединений сверх него
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
+# Для SQLite в памяти пул не настраивается, так как SQLAlchemy использует
+# для нее отдельный пул с одним соединением
+_pool_options = {} if _is_sqlite_memory else {
+    "pool_size": DB_POOL_SIZE,
+    "max_overflow": DB_MAX_OVERFLOW,
+    "pool_timeout": 30,
+    "pool_recycle": 1800,
+}
+
+# pool_pre_ping проверяет соединение при выдаче из пула, чтобы переживать перезапуск БД
+engine = create_engine(
+    DATABASE_URL,
+    pool_pre_ping=True,
+    connect_args={"check_same_thread": False} if _is_sqlite else {},
+    **_pool_options
+)
+
+# Размер кэша страниц SQLite в КиБ на одно соединение (значение SQLite по умолчанию - 2000);
+# итоговый объем умножается на число соединений в пуле
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "2000"))
+
+if _is_sqlite:
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, _connection_record):
+        """
+        Настраивает каждое новое соединение SQLite: WAL позволяет читать во время записи,
+        а synchronous=NORMAL в режиме WAL убирает fsync на каждом коммите
+        """
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        # Отрицательное значение cache_size задает размер в КиБ, а не в страницах
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        cursor.close()
 
 # Создаем фабрику сессий
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -0,0 +1,70 @@
+"""
+Модуль для условных GET-запросов.
+Формирует ETag по телу ответа и отвечает 304 Not Modified,
+если клиент прислал совпадающий If-None-Match.
+
+ETag считается по уже сериализованному телу, поэтому строки по-прежнему
+загружаются из БД и сериализуются; ответ 304 экономит только передачу тела.
+"""
+
+import hashlib
+from functools import lru_cache
+from typing import Any, Type
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+@lru_cache(maxsize=None)
+def _type_adapter(schema: Type[Any]) -> TypeAdapter:
+    # Построение TypeAdapter дорогое, поэтому он создается один раз на схему
+    return TypeAdapter(schema)
+
+def _opaque_tag(etag: str) -> str:
+    # Слабое сравнение не учитывает префикс W/
+    return etag[2:] if etag.startswith("W/") else etag
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Сравнивает ETag со значением заголовка If-None-Match.
+
+    Заголовок может содержать список тегов через запятую или "*";
+    теги сравниваются слабо, то есть W/"x" и "x" считаются равными.
+
+    Args:
+        if_none_match: Значение заголовка If-None-Match
+        etag: Текущий ETag ресурса
+
+    Returns:
+        bool: True, если клиенту можно ответить 304
+    """
+    opaque = _opaque_tag(etag)
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or _opaque_tag(candidate) == opaque:
+            return True
+    return False
+
+def etag_response(request: Request, schema: Type[Any], data: Any) -> Response:
+    """
+    Сериализует данные по схеме и возвращает ответ с ETag.
+
+    У навыков и участников проектов нет отметки времени изменения, а в проекты
+    входят данные участников (например, current_workload), которые меняются
+    в задачах и при назначении. Поэтому ETag считается по сериализованному телу:
+    он меняется при любом изменении данных, но не избавляет от запроса и сериализации.
+
+    Args:
+        request: Текущий запрос
+        schema: Схема ответа, например List[schemas.Skill]
+        data: ORM-объекты для сериализации
+
+    Returns:
+        Response: 304 без тела, если ETag совпал, иначе JSON с заголовком ETag
+    """
+    adapter = _type_adapter(schema)
+    body = adapter.dump_json(adapter.validate_python(data))
+    etag = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
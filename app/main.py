@@ -4,23 +4,47 @@ This module initializes the FastAPI application and includes all routers.
 """
 
 import logging
-from fastapi import FastAPI, HTTPException
+import os
+from contextlib import asynccontextmanager
+from anyio import to_thread
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import text
 
 from .routers import users, projects, tasks, skills, assign
-from .database import engine, Base
+from .assign import AssignError
+from .database import engine, Base, DB_POOL_SIZE, DB_MAX_OVERFLOW
+from .migrations import upgrade_schema
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Создаем таблицы в БД при первом запуске
-Base.metadata.create_all(bind=engine)
+# Синхронные обработчики и зависимости выполняются в пуле потоков anyio.
+# Потоков больше, чем соединений в пуле БД, не нужно: лишние обработчики ждали бы
+# соединение и падали по pool_timeout, а не ждали в очереди anyio. Запас по числу
+# ядер оставлен для bcrypt при входе, который выполняется уже без соединения
+THREADPOOL_SIZE = int(os.getenv(
+    "THREADPOOL_SIZE", str(DB_POOL_SIZE + DB_MAX_OVERFLOW + (os.cpu_count() or 1))
+))
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """Создает таблицы в БД и настраивает пул потоков один раз при запуске приложения."""
+    Base.metadata.create_all(bind=engine)
+    # create_all не меняет существующие таблицы; недостающие ограничения добавляются отдельно
+    upgrade_schema(engine)
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    yield
 
 app = FastAPI(
     title="TaskMaster API",
     description="API для системы управления задачами с оптимизацией назначений",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    # orjson кодирует ответы заметно быстрее стандартного json
+    default_response_class=ORJSONResponse
 )
 
 # Добавляем CORS middleware для возможности использования API из веб-приложений
@@ -39,6 +63,11 @@ app.include_router(tasks.router)
 app.include_router(skills.router)
 app.include_router(assign.router)
 
+@app.exception_handler(AssignError)
+async def assign_error_handler(_request: Request, exc: AssignError):
+    """Преобразует ошибки назначения задач в JSON-ответ с их кодом статуса."""
+    return ORJSONResponse({"detail": str(exc)}, status_code=exc.status_code)
+
 @app.get("/")
 async def root():
     """Root endpoint returning API information."""
@@ -46,12 +75,15 @@ async def root():
 
 # Эндпоинт для проверки соединения с БД
 @app.get("/health")
-async def health_check():
+def health_check():
     """Health check endpoint."""
+    # Синхронный обработчик: блокирующий запрос к БД выполняется в пуле потоков
     try:
         # Проверка подключения к БД
-        Base.metadata.create_all(bind=engine)
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
         return {"status": "healthy"}
-    except Exception as e:
-        logger.error("Health check failed: %s", str(e))
-        raise HTTPException(status_code=503, detail="Service unavailable") from e
\ No newline at end of file
+    except Exception:
+        # Причина записывается в лог один раз; цепочка исключений не сохраняется в ответе
+        logger.exception("Health check failed")
+        raise HTTPException(status_code=503, detail="Service unavailable") from None
\ No newline at end of file
@@ -0,0 +1,105 @@
+"""
+Модуль обновления схемы существующих баз данных.
+
+create_all создает только отсутствующие таблицы и не изменяет существующие,
+поэтому ограничения, добавленные в модели позже, догоняются здесь
+идемпотентными шагами при запуске приложения.
+"""
+
+import logging
+from typing import Sequence
+
+from sqlalchemy import Table, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+
+from . import models
+
+logger = logging.getLogger(__name__)
+
+# Ассоциативные таблицы и ключи, на которые опираются INSERT ... ON CONFLICT в crud
+_ASSOCIATION_KEYS = (
+    (models.project_user, "uq_project_user", ("project_id", "user_id")),
+    (models.user_skill, "uq_user_skill", ("user_id", "skill_id")),
+    (models.task_skill, "uq_task_skill", ("task_id", "skill_id")),
+)
+
+def _has_unique_key(conn: Connection, table_name: str, columns: Sequence[str]) -> bool:
+    """Проверяет, есть ли у таблицы уникальное ограничение или индекс ровно по этим колонкам"""
+    inspector = inspect(conn)
+    wanted = set(columns)
+    if any(set(constraint["column_names"]) == wanted
+           for constraint in inspector.get_unique_constraints(table_name)):
+        return True
+    return any(index["unique"] and set(index["column_names"]) == wanted
+               for index in inspector.get_indexes(table_name))
+
+def _delete_duplicates(conn: Connection, table: Table, columns: Sequence[str]) -> None:
+    """Оставляет по одной строке (добавленной последней) на каждое значение ключа"""
+    keys = ", ".join(columns)
+    if conn.dialect.name == "sqlite":
+        conn.execute(text(
+            f"DELETE FROM {table.name} WHERE rowid NOT IN "
+            f"(SELECT MAX(rowid) FROM {table.name} GROUP BY {keys})"
+        ))
+    elif conn.dialect.name == "postgresql":
+        match = " AND ".join(f"a.{column} = b.{column}" for column in columns)
+        conn.execute(text(
+            f"DELETE FROM {table.name} a USING {table.name} b WHERE a.ctid < b.ctid AND {match}"
+        ))
+
+def _ensure_association_keys(conn: Connection) -> None:
+    for table, name, columns in _ASSOCIATION_KEYS:
+        if _has_unique_key(conn, table.name, columns):
+            continue
+        _delete_duplicates(conn, table, columns)
+        conn.execute(text(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {name} ON {table.name} ({', '.join(columns)})"
+        ))
+        logger.info("Created unique index %s on %s", name, table.name)
+
+# Уникальные индексы без учета регистра, на которые опирается проверка дубликатов в crud.create_user
+_USER_LOWER_INDEXES = (
+    ("ix_users_username_lower", "username"),
+    ("ix_users_email_lower", "email"),
+)
+
+def _index_definition(conn: Connection, name: str):
+    """Возвращает SQL-определение индекса или None, если индекса нет"""
+    if conn.dialect.name == "sqlite":
+        query = "SELECT sql FROM sqlite_master WHERE type = 'index' AND name = :name"
+    elif conn.dialect.name == "postgresql":
+        query = "SELECT indexdef FROM pg_indexes WHERE indexname = :name"
+    else:
+        return None
+    return conn.execute(text(query), {"name": name}).scalar()
+
+def _ensure_user_lower_indexes(engine: Engine) -> None:
+    for name, column in _USER_LOWER_INDEXES:
+        with engine.begin() as conn:
+            definition = _index_definition(conn, name)
+            if definition is not None and "UNIQUE" in definition.upper():
+                continue
+            if definition is not None:
+                conn.execute(text(f"DROP INDEX {name}"))
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(f"CREATE UNIQUE INDEX {name} ON users (lower({column}))"))
+            logger.info("Created unique index %s on users", name)
+        except IntegrityError:
+            # Уже есть пользователи, отличающиеся только регистром: удалять их нельзя,
+            # поэтому оставляем обычный индекс, а дубликаты отсекает проверка в crud
+            logger.warning("Duplicate users by lower(%s); %s created as non-unique", column, name)
+            with engine.begin() as conn:
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON users (lower({column}))"))
+
+def upgrade_schema(engine: Engine) -> None:
+    """
+    Доводит схему существующей БД до текущих моделей.
+
+    Args:
+        engine: Движок SQLAlchemy; таблицы уже должны быть созданы create_all
+    """
+    with engine.begin() as conn:
+        _ensure_association_keys(conn)
+    _ensure_user_lower_indexes(engine)
@@ -5,7 +5,7 @@
 таблицы в базе данных и их отношения.
 """
 
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime, Enum, Float, Table
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String, DateTime, Enum, Float, Table, UniqueConstraint, func
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -16,8 +16,9 @@ from .database import Base
 project_user = Table(
     "project_user",
     Base.metadata,
-    Column("user_id", Integer, ForeignKey("users.id")),
-    Column("project_id", Integer, ForeignKey("projects.id"))
+    Column("user_id", Integer, ForeignKey("users.id"), index=True),
+    Column("project_id", Integer, ForeignKey("projects.id")),
+    UniqueConstraint("project_id", "user_id", name="uq_project_user")
 )
 
 # Ассоциативная таблица для связи многие-ко-многим между пользователями и навыками
@@ -25,8 +26,9 @@ user_skill = Table(
     "user_skill",
     Base.metadata,
     Column("user_id", Integer, ForeignKey("users.id")),
-    Column("skill_id", Integer, ForeignKey("skills.id")),
-    Column("level", Integer, default=1)  # Уровень навыка от 1 до 5
+    Column("skill_id", Integer, ForeignKey("skills.id"), index=True),
+    Column("level", Integer, default=1),  # Уровень навыка от 1 до 5
+    UniqueConstraint("user_id", "skill_id", name="uq_user_skill")
 )
 
 # Ассоциативная таблица для связи многие-ко-многим между задачами и требуемыми навыками
@@ -34,8 +36,9 @@ task_skill = Table(
     "task_skill",
     Base.metadata,
     Column("task_id", Integer, ForeignKey("tasks.id")),
-    Column("skill_id", Integer, ForeignKey("skills.id")),
-    Column("required_level", Integer, default=1)  # Необходимый уровень навыка
+    Column("skill_id", Integer, ForeignKey("skills.id"), index=True),
+    Column("required_level", Integer, default=1),  # Необходимый уровень навыка
+    UniqueConstraint("task_id", "skill_id", name="uq_task_skill")
 )
 
 class TaskPriority(str, enum.Enum):
@@ -74,6 +77,12 @@ class User(Base):
     workload_capacity = Column(Float, default=100.0)  # Максимальная загрузка пользователя (в часах в неделю)
     current_workload = Column(Float, default=0.0)  # Текущая загрузка пользователя
 
+    # Уникальные функциональные индексы: поиск без учета регистра и защита от дубликатов
+    __table_args__ = (
+        Index("ix_users_username_lower", func.lower(username), unique=True),
+        Index("ix_users_email_lower", func.lower(email), unique=True),
+    )
+
     # Отношения
     tasks = relationship("Task", back_populates="assignee")
     projects = relationship("Project", secondary=project_user, back_populates="members")
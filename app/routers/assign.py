@@ -16,9 +16,6 @@ router = APIRouter(
     dependencies=[Depends(get_current_active_user)]
 )
 
-# Expose the assign_tasks function
-assign_tasks = assign_tasks
-
 @router.post("/tasks", response_model=schemas.AutoAssignmentResponse)
 def assign_project_tasks(
     assignment_request: schemas.AssignmentRequest,
@@ -34,20 +31,16 @@ def assign_project_tasks(
     project_id = assignment_request.project_id
     optimize_for = assignment_request.optimize_for
     
-    project = crud.get_project(db, project_id)
-    if not project:
+    project_exists, is_member = crud.get_project_membership(db, project_id, current_user.id)
+    if not project_exists:
         raise HTTPException(status_code=404, detail="Project not found")
     
     # Проверяем, что пользователь является участником проекта
-    is_member = any(member.id == current_user.id for member in project.members)
     if not is_member:
         raise HTTPException(
             status_code=403,
             detail="You must be a member of the project to assign tasks"
         )
     
-    try:
-        result = assign_tasks(db, project_id, optimize_for)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) from e 
\ No newline at end of file
+    # Ошибки назначения преобразуются в ответ обработчиком AssignError в main.py
+    return assign_tasks(db, project_id, optimize_for) 
\ No newline at end of file
@@ -2,13 +2,14 @@
 Projects router module.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from typing import List
 
 from .. import models, schemas, crud
 from ..database import get_db
 from ..auth import get_current_active_user
+from ..etag import etag_response
 
 router = APIRouter(
     prefix="/projects",
@@ -28,15 +29,15 @@ def create_project(project: schemas.ProjectCreate, db: Session = Depends(get_db)
     return crud.get_project(db, project_id=db_project.id)
 
 @router.get("/", response_model=List[schemas.Project])
-def read_projects(skip: int = 0, limit: int = 100, db: Session = Depends(get_db),
+def read_projects(request: Request, skip: int = 0, limit: int = 100, db: Session = Depends(get_db),
                  current_user: models.User = Depends(get_current_active_user)):
     projects = crud.get_projects(db, skip=skip, limit=limit)
-    return projects
+    return etag_response(request, List[schemas.Project], projects)
 
 @router.get("/{project_id}", response_model=schemas.Project)
 def read_project(project_id: int, db: Session = Depends(get_db),
                 current_user: models.User = Depends(get_current_active_user)):
-    db_project = crud.get_project(db, project_id=project_id)
+    db_project = crud.get_project_with_members(db, project_id=project_id)
     if db_project is None:
         raise HTTPException(status_code=404, detail="Project not found")
     return db_project
@@ -45,11 +46,11 @@ def read_project(project_id: int, db: Session = Depends(get_db),
 def update_project(project_id: int, project: schemas.ProjectUpdate, db: Session = Depends(get_db),
                   current_user: models.User = Depends(get_current_active_user)):
     # Проверяем, что пользователь является участником проекта
-    db_project = crud.get_project(db, project_id=project_id)
+    db_project = crud.get_project_with_members(db, project_id=project_id)
     if db_project is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    if current_user not in db_project.members:
+    if current_user.id not in {member.id for member in db_project.members}:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
     db_project = crud.update_project(db, project_id=project_id, project=project)
@@ -59,11 +60,11 @@ def update_project(project_id: int, project: schemas.ProjectUpdate, db: Session
 def delete_project(project_id: int, db: Session = Depends(get_db),
                   current_user: models.User = Depends(get_current_active_user)):
     # Проверяем, что пользователь является участником проекта
-    db_project = crud.get_project(db, project_id=project_id)
-    if db_project is None:
+    project_exists, is_member = crud.get_project_membership(db, project_id, current_user.id)
+    if not project_exists:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    if current_user not in db_project.members:
+    if not is_member:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
     result = crud.delete_project(db, project_id=project_id)
@@ -73,11 +74,11 @@ def delete_project(project_id: int, db: Session = Depends(get_db),
 def add_member_to_project(project_id: int, user_id: int, db: Session = Depends(get_db),
                           current_user: models.User = Depends(get_current_active_user)):
     # Проверяем, что текущий пользователь является участником проекта
-    db_project = crud.get_project(db, project_id=project_id)
+    db_project = crud.get_project_with_members(db, project_id=project_id)
     if db_project is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    if current_user not in db_project.members:
+    if current_user.id not in {member.id for member in db_project.members}:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
     # Проверяем, что пользователь существует
@@ -95,11 +96,11 @@ def add_member_to_project(project_id: int, user_id: int, db: Session = Depends(g
 def remove_member_from_project(project_id: int, user_id: int, db: Session = Depends(get_db),
                                current_user: models.User = Depends(get_current_active_user)):
     # Проверяем, что текущий пользователь является участником проекта
-    db_project = crud.get_project(db, project_id=project_id)
+    db_project = crud.get_project_with_members(db, project_id=project_id)
     if db_project is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    if current_user not in db_project.members:
+    if current_user.id not in {member.id for member in db_project.members}:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
     # Нельзя удалить последнего участника проекта
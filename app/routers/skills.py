@@ -2,23 +2,25 @@
 Skills router module.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from typing import List
 
-from .. import models, schemas, crud
+from .. import schemas, crud
 from ..database import get_db
 from ..auth import get_current_active_user
+from ..etag import etag_response
 
 router = APIRouter(
     prefix="/skills",
     tags=["skills"],
+    # Аутентификация проверяется один раз на уровне роутера; обработчикам
+    # текущий пользователь не нужен
     dependencies=[Depends(get_current_active_user)]
 )
 
 @router.post("/", response_model=schemas.Skill)
-def create_skill(skill: schemas.SkillCreate, db: Session = Depends(get_db),
-                current_user: models.User = Depends(get_current_active_user)):
+def create_skill(skill: schemas.SkillCreate, db: Session = Depends(get_db)):
     # Проверяем, не существует ли уже навык с таким именем
     db_skill = crud.get_skill_by_name(db, name=skill.name)
     if db_skill:
@@ -27,48 +29,35 @@ def create_skill(skill: schemas.SkillCreate, db: Session = Depends(get_db),
     return crud.create_skill(db=db, skill=skill)
 
 @router.get("/", response_model=List[schemas.Skill])
-def read_skills(skip: int = 0, limit: int = 100, db: Session = Depends(get_db),
-               current_user: models.User = Depends(get_current_active_user)):
+def read_skills(request: Request, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     skills = crud.get_skills(db, skip=skip, limit=limit)
-    return skills
+    return etag_response(request, List[schemas.Skill], skills)
 
 @router.get("/{skill_id}", response_model=schemas.Skill)
-def read_skill(skill_id: int, db: Session = Depends(get_db),
-              current_user: models.User = Depends(get_current_active_user)):
+def read_skill(skill_id: int, db: Session = Depends(get_db)):
     db_skill = crud.get_skill(db, skill_id=skill_id)
     if db_skill is None:
         raise HTTPException(status_code=404, detail="Skill not found")
     return db_skill
 
 @router.delete("/{skill_id}", response_model=bool)
-def delete_skill(skill_id: int, db: Session = Depends(get_db),
-                current_user: models.User = Depends(get_current_active_user)):
-    # Сначала проверяем, существует ли навык
-    db_skill = crud.get_skill(db, skill_id=skill_id)
-    if db_skill is None:
+def delete_skill(skill_id: int, db: Session = Depends(get_db)):
+    # Один DELETE; отсутствие удаленной строки означает, что навыка нет
+    if not crud.delete_skill(db, skill_id=skill_id):
         raise HTTPException(status_code=404, detail="Skill not found")
-    
-    result = crud.delete_skill(db, skill_id=skill_id)
-    return result
+    return True
 
 @router.put("/{skill_id}", response_model=schemas.Skill)
 def update_skill(
     skill_id: int,
     skill: schemas.SkillCreate,
-    db: Session = Depends(get_db),
-    current_user: schemas.User = Depends(get_current_active_user)
+    db: Session = Depends(get_db)
 ):
     """
     Update a skill.
     """
-    db_skill = crud.get_skill(db, skill_id)
-    if db_skill is None:
+    if not crud.update_skill(db, skill_id, skill):
         raise HTTPException(status_code=404, detail="Skill not found")
     
-    # Update skill fields
-    db_skill.name = skill.name
-    db_skill.description = skill.description
-    
-    db.commit()
-    db.refresh(db_skill)
-    return db_skill 
\ No newline at end of file
+    # Все поля ответа известны, поэтому навык не перечитывается из БД
+    return schemas.Skill(id=skill_id, **skill.model_dump()) 
\ No newline at end of file
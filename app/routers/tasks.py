@@ -2,9 +2,10 @@
 Tasks router module.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 from .. import models, schemas, crud
 from ..database import get_db
@@ -16,44 +17,55 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+def _ndjson_tasks(db: Session, **filters) -> Iterator[bytes]:
+    # Сессия из get_db закрывается до отправки тела ответа, поэтому задачи читаются
+    # в отдельной сессии, которая живет, пока отправляется ответ
+    with Session(bind=db.get_bind()) as stream_db:
+        for task in crud.iter_tasks(stream_db, **filters):
+            yield schemas.Task.model_validate(task).model_dump_json().encode() + b"\n"
+
 @router.post("/", response_model=schemas.Task)
 def create_task(task: schemas.TaskCreate, db: Session = Depends(get_db),
                current_user: models.User = Depends(get_current_active_user)):
     # Проверяем, что проект существует и пользователь имеет к нему доступ
-    db_project = crud.get_project(db, project_id=task.project_id)
-    if not db_project:
+    project_exists, is_member = crud.get_project_membership(db, task.project_id, current_user.id)
+    if not project_exists:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    if current_user not in db_project.members:
+    if not is_member:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
     # Создаем задачу
     return crud.create_task(db=db, task=task)
 
 @router.get("/", response_model=List[schemas.Task])
-def read_tasks(skip: int = 0, limit: int = 100, project_id: int = None, 
+def read_tasks(request: Request, skip: int = 0, limit: int = 100, project_id: int = None, 
               db: Session = Depends(get_db),
               current_user: models.User = Depends(get_current_active_user)):
     # Если указан ID проекта, проверяем, что пользователь имеет к нему доступ
     if project_id:
-        db_project = crud.get_project(db, project_id=project_id)
-        if not db_project:
+        project_exists, is_member = crud.get_project_membership(db, project_id, current_user.id)
+        if not project_exists:
             raise HTTPException(status_code=404, detail="Project not found")
         
-        if current_user not in db_project.members:
+        if not is_member:
             raise HTTPException(status_code=403, detail="Not enough permissions")
-        
+    
+    # По запросу клиента отдаем задачи построчно в NDJSON: строки выбираются из БД
+    # партиями по мере отправки, без загрузки всей страницы в память
+    if NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        return StreamingResponse(
+            _ndjson_tasks(db, user_id=current_user.id, project_id=project_id, skip=skip, limit=limit),
+            media_type=NDJSON_MEDIA_TYPE
+        )
+    
+    if project_id:
         tasks = crud.get_project_tasks(db, project_id=project_id, skip=skip, limit=limit)
     else:
         # Получаем все задачи, доступные пользователю
-        tasks = []
-        user_projects = current_user.projects
-        for project in user_projects:
-            project_tasks = crud.get_project_tasks(db, project_id=project.id)
-            tasks.extend(project_tasks)
-        
-        # Применяем пагинацию вручную
-        tasks = tasks[skip:skip+limit]
+        tasks = crud.get_tasks_visible_to_user(db, user_id=current_user.id, skip=skip, limit=limit)
     
     return tasks
 
@@ -72,8 +84,7 @@ def read_task(task_id: int, db: Session = Depends(get_db),
         raise HTTPException(status_code=404, detail="Task not found")
     
     # Проверяем, имеет ли пользователь доступ к проекту, в котором находится задача
-    db_project = crud.get_project(db, project_id=db_task.project_id)
-    if current_user not in db_project.members:
+    if not crud.user_is_project_member(db, db_task.project_id, current_user.id):
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
     return db_task
@@ -87,8 +98,7 @@ def update_task(task_id: int, task: schemas.TaskUpdate, db: Session = Depends(ge
         raise HTTPException(status_code=404, detail="Task not found")
     
     # Проверяем, имеет ли пользователь доступ к проекту, в котором находится задача
-    db_project = crud.get_project(db, project_id=db_task.project_id)
-    if current_user not in db_project.members:
+    if not crud.user_is_project_member(db, db_task.project_id, current_user.id):
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
     # Обновляем задачу
@@ -103,8 +113,7 @@ def delete_task(task_id: int, db: Session = Depends(get_db),
         raise HTTPException(status_code=404, detail="Task not found")
     
     # Проверяем, имеет ли пользователь доступ к проекту, в котором находится задача
-    db_project = crud.get_project(db, project_id=db_task.project_id)
-    if current_user not in db_project.members:
+    if not crud.user_is_project_member(db, db_task.project_id, current_user.id):
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
     # Удаляем задачу
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import timedelta
@@ -16,14 +17,11 @@ router = APIRouter(
 
 @router.post("/register", response_model=schemas.User)
 def register_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    # First check if username already exists
-    db_user = crud.get_user_by_username(db, user.username)
+    # Check username and email with one query, then report which one is taken
+    db_user = crud.get_user_by_username_or_email(db, user.username, user.email)
     if db_user:
-        raise HTTPException(status_code=400, detail="Username already registered")
-    
-    # Then check if email already exists
-    db_user_email = crud.get_user_by_email(db, user.email)
-    if db_user_email:
+        if db_user.username.lower() == user.username.lower():
+            raise HTTPException(status_code=400, detail="Username already registered")
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create the new user
@@ -35,16 +33,23 @@ def register_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
     return new_user
 
 @router.post("/token", response_model=schemas.Token)
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = crud.get_user_by_username(db, form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    credentials = crud.get_login_credentials(db, form_data.username)
+    # Завершаем транзакцию чтения до проверки bcrypt, чтобы соединение
+    # вернулось в пул, пока идет долгое хеширование
+    db.commit()
+    
+    # Обработчик синхронный и выполняется в пуле потоков, поэтому bcrypt не блокирует цикл событий
+    stored_hash = credentials[1] if credentials else auth.DUMMY_PASSWORD_HASH
+    password_ok = verify_password(form_data.password, stored_hash)
+    if not credentials or not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token = create_access_token(data={"sub": user.username})
+    access_token = create_access_token(data={"sub": credentials[0]})
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=schemas.User)
@@ -60,7 +65,8 @@ def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db),
 @router.get("/{user_id}", response_model=schemas.UserWithSkills)
 def read_user(user_id: int, db: Session = Depends(get_db),
               current_user: models.User = Depends(get_current_active_user)):
-    db_user = crud.get_user(db, user_id=user_id)
+    # Навыки сериализуются в ответе, поэтому загружаются тем же запросом
+    db_user = crud.get_user_with_skills(db, user_id=user_id)
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return db_user
@@ -75,15 +81,17 @@ def update_user(
     """
     Update a user.
     """
-    db_user = crud.get_user(db, user_id)
-    if not db_user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
     # For testing purposes, allow any authenticated user to update any user
     # In a real app, you would want to check permissions here
     # (e.g. only allow users to update their own profile or require admin permissions)
     
-    updated_user = crud.update_user(db, user_id=user_id, user=user)
+    # crud returns None when no row was updated, so no pre-fetch is needed
+    try:
+        updated_user = crud.update_user(db, user_id=user_id, user=user)
+    except IntegrityError:
+        raise HTTPException(status_code=400, detail="Username or email already registered") from None
+    if updated_user is None:
+        raise HTTPException(status_code=404, detail="User not found")
     return updated_user
 
 @router.delete("/{user_id}")
@@ -105,6 +113,18 @@ def delete_user(
     result = crud.delete_user(db, user_id=user_id)
     return {"success": result}
 
+def _raise_user_skill_error(db: Session, user_id: int, skill_id: int, detail: str):
+    """
+    Raise 404 for a missing skill or user, otherwise 400 with the given detail.
+    Only called on the error path, so successful requests skip the existence query.
+    """
+    user_exists, skill_exists = crud.check_user_and_skill_exist(db, user_id, skill_id)
+    if not skill_exists:
+        raise HTTPException(status_code=404, detail="Skill not found")
+    if not user_exists:
+        raise HTTPException(status_code=404, detail="User not found")
+    raise HTTPException(status_code=400, detail=detail)
+
 @router.post("/{user_id}/skills/{skill_id}", response_model=schemas.UserWithSkills)
 def add_skill_to_user(
     user_id: int, skill_id: int, level: int = 1,
@@ -114,23 +134,13 @@ def add_skill_to_user(
     """
     Add a skill to a user with a specified level.
     """
-    # Check if skill exists
-    skill = crud.get_skill(db, skill_id=skill_id)
-    if not skill:
-        raise HTTPException(status_code=404, detail="Skill not found")
-    
-    # Check if user exists
-    user = crud.get_user(db, user_id=user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
     # For testing purposes, allow any user to add skills to any user
     # In a real app, would check permissions here
     
-    # Add skill to user
+    # Add skill to user; crud checks that both exist with a single query
     result = crud.add_skill_to_user(db, user_id=user_id, skill_id=skill_id, level=level)
     if not result:
-        raise HTTPException(status_code=400, detail="Could not add skill to user")
+        _raise_user_skill_error(db, user_id, skill_id, "Could not add skill to user")
     
     return result
 
@@ -143,22 +153,12 @@ def remove_skill_from_user(
     """
     Remove a skill from a user.
     """
-    # Check if skill exists
-    skill = crud.get_skill(db, skill_id=skill_id)
-    if not skill:
-        raise HTTPException(status_code=404, detail="Skill not found")
-    
-    # Check if user exists
-    user = crud.get_user(db, user_id=user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
     # For testing purposes, allow any user to remove skills from any user
     # In a real app, would check permissions here
     
-    # Remove skill from user
+    # Remove skill from user; existence is only checked if nothing was removed
     result = crud.remove_skill_from_user(db, user_id=user_id, skill_id=skill_id)
     if not result:
-        raise HTTPException(status_code=400, detail="Could not remove skill from user")
+        _raise_user_skill_error(db, user_id, skill_id, "Could not remove skill from user")
     
     return result 
\ No newline at end of file
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field, EmailStr
+from typing import List, Literal, Optional
 from datetime import datetime
 from .models import TaskStatus, TaskPriority
 
@@ -22,8 +22,7 @@ class SkillCreate(SkillBase):
 class Skill(SkillBase):
     id: int
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Схемы для пользователя
 class UserBase(BaseModel):
@@ -52,8 +51,7 @@ class UserWithSkills(UserBase):
     current_workload: float
     skills: List[Skill] = []
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class User(UserBase):
     id: int
@@ -61,8 +59,7 @@ class User(UserBase):
     created_at: datetime
     current_workload: float
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Схемы для проекта
 class ProjectBase(BaseModel):
@@ -81,8 +78,7 @@ class Project(ProjectBase):
     created_at: datetime
     members: List[User] = []
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Схемы для задачи
 class TaskBase(BaseModel):
@@ -118,13 +114,15 @@ class Task(TaskBase):
     assignee_id: Optional[int] = None
     required_skills: List[Skill] = []
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Схемы для автоматического назначения
+# Допустимые стратегии проверяются Pydantic до вызова обработчика
+OptimizationStrategy = Literal["balanced", "workload", "skills", "priority"]
+
 class AssignTasksRequest(BaseModel):
     project_id: int
-    optimize_for: Optional[str] = "balanced"  # balanced, workload, skills, priority
+    optimize_for: Optional[OptimizationStrategy] = "balanced"
 
 class TaskAssignmentResult(BaseModel):
     task_id: int
@@ -138,7 +136,6 @@ class AutoAssignmentResponse(BaseModel):
 
 class AssignmentRequest(BaseModel):
     project_id: int
-    optimize_for: str = "balanced"
+    optimize_for: OptimizationStrategy = "balanced"
     
-    class Config:
-        from_attributes = True 
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True) 
\ No newline at end of file
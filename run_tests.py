@@ -1,19 +1,30 @@
 #!/usr/bin/env python3
+import importlib.util
 import subprocess
 import sys
 
 
+def ensure_installed(package, module):
+    """Устанавливает пакет через pip, только если модуль еще не доступен"""
+    if importlib.util.find_spec(module) is None:
+        subprocess.run([sys.executable, "-m", "pip", "install", package], check=True)
+
+
 def run_tests():
     """Запускает тесты и генерирует отчет о покрытии"""
     print("Запуск тестов с проверкой покрытия...")
     
     try:
-        # Устанавливаем pytest-cov если он не установлен
-        subprocess.run([sys.executable, "-m", "pip", "install", "pytest-cov"], check=True)
+        # Устанавливаем pytest-cov и pytest-xdist если они не установлены
+        ensure_installed("pytest-cov", "pytest_cov")
+        ensure_installed("pytest-xdist", "xdist")
         
-        # Запускаем тесты с покрытием
+        # Запускаем тесты с покрытием параллельно на всех ядрах; loadfile держит
+        # тесты одного модуля в одном процессе, у каждого процесса своя SQLite в памяти
         result = subprocess.run([
             sys.executable, "-m", "pytest", 
+            "-n", "auto",
+            "--dist=loadfile",
             "--cov=app", 
             "--cov-report=term", 
             "--cov-report=html:coverage_html"
@@ -38,9 +49,7 @@ def run_tests():
         
         # Запускаем pylint
         print("\nЗапуск проверки кода с pylint...")
-        pylint_result = subprocess.run([
-            sys.executable, "-m", "pip", "install", "pylint"
-        ], check=True)
+        ensure_installed("pylint", "pylint")
         
         pylint_result = subprocess.run([
             sys.executable, "-m", "pylint", "app", "--output-format=text", "--reports=y"
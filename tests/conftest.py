@@ -1,19 +1,23 @@
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine, insert
+from sqlalchemy import create_engine, event, insert
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 import jwt
 from datetime import datetime, timedelta
 from passlib.context import CryptContext
 import uuid
+import os
+
+# Минимальная стоимость bcrypt ускоряет тесты; задается до импорта приложения
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
 
 # Important - import the app correctly from app.main
 from app.main import app as fastapi_app
 from app.database import Base, get_db
-from app.models import User, Project, Task, Skill, project_user, user_skill, task_skill
+from app.models import User, Project, Task, Skill, TaskPriority, TaskStatus, project_user, user_skill, task_skill
 from app import crud, models, schemas
-from app.auth import get_password_hash
+from app.auth import create_access_token, get_password_hash
 
 # Переопределяем секретный ключ для тестов
 import app.auth
@@ -29,20 +33,38 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# pysqlite сам управляет транзакциями и ломает SAVEPOINT; передаем управление SQLAlchemy
+@event.listens_for(engine, "connect")
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+@event.listens_for(engine, "begin")
+def _emit_begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
 # Создаем временный клиент для тестирования API
 client = TestClient(fastapi_app)
 
 # Создаем контекст хэширования для тестов
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4, deprecated="auto")
 
-# Фикстура для создания тестовой базы данных
-@pytest.fixture(scope="function")
-def test_db_session():
-    # Создаем таблицы базы данных заново перед каждым тестом
+# Схема БД создается один раз на всю тестовую сессию
+@pytest.fixture(scope="session")
+def test_db_schema():
     Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+# Фикстура для создания тестовой базы данных: каждый тест выполняется во внешней
+# транзакции, которая откатывается в конце, а commit/rollback внутри приложения
+# работают с точками сохранения (SAVEPOINT)
+@pytest.fixture(scope="function")
+def test_db_session(test_db_schema):
+    connection = engine.connect()
+    transaction = connection.begin()
     
-    # Создаем сессию базы данных
-    session = TestingSessionLocal()
+    # Создаем сессию базы данных, привязанную к внешней транзакции
+    session = TestingSessionLocal(bind=connection, join_transaction_mode="create_savepoint")
     
     # Переопределяем зависимость БД в FastAPI для тестов
     def override_get_db():
@@ -59,9 +81,10 @@ def test_db_session():
     # Отдаем сессию тесту
     yield session
     
-    # Очищаем после теста
+    # Откатываем все изменения теста
     session.close()
-    Base.metadata.drop_all(bind=engine)
+    transaction.rollback()
+    connection.close()
 
 # Фикстура для создания тестового пользователя
 @pytest.fixture(scope="function")
@@ -80,133 +103,82 @@ def test_user(test_db_session: Session):
     test_db_session.refresh(user)
     return user
 
-# Фикстура для заголовков авторизации
+# Фикстура для заголовков авторизации. Токен выпускается напрямую, без запроса
+# к /users/token и проверки bcrypt; пользователь создается заново в каждом тесте,
+# поэтому фикстура остается на уровне функции
 @pytest.fixture(scope="function")
 def auth_headers(test_user: User):
-    # Получаем токен через login endpoint
-    login_response = client.post(
-        "/users/token",
-        data={"username": "testuser", "password": "password"}
-    )
-    token = login_response.json()["access_token"]
+    token = create_access_token({"sub": test_user.username}, expires_delta=timedelta(hours=1))
     
     # Возвращаем заголовок с токеном
     return {"Authorization": f"Bearer {token}"}
 
-# Фикстура для создания тестового проекта с пользователями и задачами
+# Фикстура для создания тестового проекта с пользователями и задачами.
+# Данные записываются напрямую в БД пакетными INSERT, без HTTP-запросов:
+# через API проверяются только тестируемые эндпоинты
 @pytest.fixture(scope="function")
-def setup_project_with_users_and_tasks(test_db_session: Session, auth_headers: dict):
-    # Регистрируем основного пользователя
-    client.post(
-        "/users/register",
-        json={
-            "username": "testuser",
-            "email": "test@example.com",
-            "password": "password",
-            "workload_capacity": 100.0,
-            "current_workload": 0.0
-        }
-    )
-    
-    # Получаем токен для дальнейших запросов
-    token_response = client.post(
-        "/users/token",
-        data={"username": "testuser", "password": "password"}
-    )
+def setup_project_with_users_and_tasks(test_db_session: Session, test_user: User):
+    hashed_password = get_password_hash("password")
     
-    # Создаем проект
-    project_response = client.post(
-        "/projects/",
-        json={"name": "Test Project", "description": "Test Project Description"},
-        headers=auth_headers
-    )
-    project_id = project_response.json()["id"]
-    
-    # Создаем 3 дополнительных пользователя
-    user_ids = []
-    for i in range(3):
-        user_response = client.post(
-            "/users/register",
-            json={
-                "username": f"user{i+1}",
-                "email": f"user{i+1}@example.com",
-                "password": "password",
-                "workload_capacity": 100.0,
-                "current_workload": 0.0
-            }
+    # Создаем проект, 3 дополнительных пользователей и навыки
+    project = Project(name="Test Project", description="Test Project Description")
+    users = [
+        User(
+            username=f"user{i+1}",
+            email=f"user{i+1}@example.com",
+            hashed_password=hashed_password,
+            workload_capacity=100.0,
+            current_workload=0.0
         )
-        user_ids.append(user_response.json()["id"])
+        for i in range(3)
+    ]
+    skills = [Skill(name=f"Skill {i+1}", description=f"Skill {i+1} Description") for i in range(4)]
+    test_db_session.add_all([project, *users, *skills])
+    test_db_session.flush()
+    user_ids = [user.id for user in users]
+    skill_ids = [skill.id for skill in skills]
     
     # Добавляем пользователей в проект
-    for user_id in user_ids:
-        client.post(
-            f"/projects/{project_id}/members/{user_id}",
-            headers=auth_headers
-        )
-    
-    # Создаем навыки
-    skill_ids = []
-    for i in range(4):
-        skill_response = client.post(
-            "/skills/",
-            json={"name": f"Skill {i+1}", "description": f"Skill {i+1} Description"},
-            headers=auth_headers
-        )
-        skill_ids.append(skill_response.json()["id"])
+    test_db_session.execute(
+        insert(project_user),
+        [{"project_id": project.id, "user_id": user_id} for user_id in [test_user.id, *user_ids]]
+    )
     
     # Добавляем навыки пользователям
-    client.post(f"/users/{user_ids[0]}/skills/{skill_ids[0]}?level=5", headers=auth_headers)
-    client.post(f"/users/{user_ids[0]}/skills/{skill_ids[1]}?level=3", headers=auth_headers)
-    client.post(f"/users/{user_ids[1]}/skills/{skill_ids[1]}?level=4", headers=auth_headers)
-    client.post(f"/users/{user_ids[1]}/skills/{skill_ids[2]}?level=4", headers=auth_headers)
-    client.post(f"/users/{user_ids[2]}/skills/{skill_ids[0]}?level=2", headers=auth_headers)
-    client.post(f"/users/{user_ids[2]}/skills/{skill_ids[2]}?level=3", headers=auth_headers)
-    client.post(f"/users/{user_ids[2]}/skills/{skill_ids[3]}?level=5", headers=auth_headers)
+    test_db_session.execute(insert(user_skill), [
+        {"user_id": user_ids[0], "skill_id": skill_ids[0], "level": 5},
+        {"user_id": user_ids[0], "skill_id": skill_ids[1], "level": 3},
+        {"user_id": user_ids[1], "skill_id": skill_ids[1], "level": 4},
+        {"user_id": user_ids[1], "skill_id": skill_ids[2], "level": 4},
+        {"user_id": user_ids[2], "skill_id": skill_ids[0], "level": 2},
+        {"user_id": user_ids[2], "skill_id": skill_ids[2], "level": 3},
+        {"user_id": user_ids[2], "skill_id": skill_ids[3], "level": 5},
+    ])
     
     # Создаем задачи
-    task_ids = []
     task_data = [
-        {
-            "title": "Task 1", 
-            "description": "Task 1 Description",
-            "project_id": project_id,
-            "status": "TODO",
-            "priority": "HIGH",
-            "estimated_hours": 10.0
-        },
-        {
-            "title": "Task 2", 
-            "description": "Task 2 Description",
-            "project_id": project_id,
-            "status": "TODO",
-            "priority": "MEDIUM",
-            "estimated_hours": 5.0
-        },
-        {
-            "title": "Task 3", 
-            "description": "Task 3 Description",
-            "project_id": project_id,
-            "status": "TODO",
-            "priority": "LOW",
-            "estimated_hours": 3.0
-        },
-        {
-            "title": "Task 4", 
-            "description": "Task 4 Description",
-            "project_id": project_id,
-            "status": "TODO",
-            "priority": "MEDIUM",
-            "estimated_hours": 8.0
-        }
+        ("Task 1", TaskPriority.HIGH, 10.0),
+        ("Task 2", TaskPriority.MEDIUM, 5.0),
+        ("Task 3", TaskPriority.LOW, 3.0),
+        ("Task 4", TaskPriority.MEDIUM, 8.0),
     ]
-    
-    for task in task_data:
-        task_response = client.post("/tasks/", json=task, headers=auth_headers)
-        task_ids.append(task_response.json()["id"])
+    tasks = [
+        Task(
+            title=title,
+            description=f"{title} Description",
+            project_id=project.id,
+            status=TaskStatus.TODO,
+            priority=priority,
+            estimated_hours=estimated_hours
+        )
+        for title, priority, estimated_hours in task_data
+    ]
+    test_db_session.add_all(tasks)
+    test_db_session.commit()
     
     return {
-        "project_id": project_id,
+        "project_id": project.id,
         "user_ids": user_ids,
         "skill_ids": skill_ids,
-        "task_ids": task_ids
-    } 
\ No newline at end of file
+        "task_ids": [task.id for task in tasks]
+    }
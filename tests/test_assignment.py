@@ -1,6 +1,8 @@
 import pytest
+import numpy as np
+from datetime import timedelta
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, insert
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 from fastapi import HTTPException
@@ -8,9 +10,11 @@ from sqlalchemy.orm import Session
 
 from app.main import app
 from app.database import Base, get_db
-from app.models import User, Project, Task, Skill, user_skill, task_skill
+from app.models import User, Project, Task, Skill, project_user, user_skill, task_skill
+from app.auth import create_access_token, get_password_hash
 from app import crud, models, schemas
 from app.routers import assign
+from app.assign import AssignError, ProjectNotFoundError, TaskAssignmentOptimizer, assign_tasks
 from .conftest import test_db_session, auth_headers, test_user, setup_project_with_users_and_tasks, client
 
 # Используем ту же тестовую БД и клиент, что и в других тестах
@@ -51,173 +55,85 @@ def auth_headers(test_db):
         },
     )
     
-    # Логинимся и получаем токен
-    login_response = client.post(
-        "/users/token",
-        data={
-            "username": "testuser",
-            "password": "password123"
-        },
-    )
-    token = login_response.json()["access_token"]
+    # Выпускаем токен напрямую, без проверки пароля через /users/token
+    token = create_access_token({"sub": "testuser"}, expires_delta=timedelta(hours=1))
     
     return {"Authorization": f"Bearer {token}"}
 
 @pytest.fixture
-def setup_project_with_users_and_tasks(auth_headers):
-    # 1. Создаем проект
-    project_response = client.post(
-        "/projects/",
-        json={
-            "name": "Assignment Test Project",
-            "description": "Project for testing task assignment"
-        },
-        headers=auth_headers
-    )
-    project_id = project_response.json()["id"]
-    
-    # 2. Создаем дополнительных пользователей
-    user_ids = []
-    for i in range(3):
-        user_response = client.post(
-            "/users/register",
-            json={
-                "username": f"user{i}",
-                "email": f"user{i}@example.com",
-                "password": "password123",
-                "workload_capacity": 100.0
-            }
-        )
-        user_ids.append(user_response.json()["id"])
-    
-    # 3. Добавляем пользователей в проект
-    for user_id in user_ids:
-        client.post(
-            f"/projects/{project_id}/members/{user_id}",
-            headers=auth_headers
+def setup_project_with_users_and_tasks(test_db_session: Session, auth_headers):
+    # Данные записываются напрямую в БД пакетными INSERT; через API вызывается только назначение
+    owner = crud.get_user_by_username(test_db_session, "testuser")
+    hashed_password = get_password_hash("password123")
+    
+    # 1. Создаем проект, дополнительных пользователей и навыки
+    project = Project(name="Assignment Test Project", description="Project for testing task assignment")
+    users = [
+        User(
+            username=f"user{i}",
+            email=f"user{i}@example.com",
+            hashed_password=hashed_password,
+            workload_capacity=100.0,
+            current_workload=0.0
         )
-    
-    # 4. Создаем навыки
-    skill_ids = []
-    for skill_name in ["Python", "JavaScript", "SQL", "UI/UX"]:
-        skill_response = client.post(
-            "/skills/",
-            json={
-                "name": skill_name,
-                "description": f"Skill in {skill_name}"
-            },
-            headers=auth_headers
-        )
-        skill_ids.append(skill_response.json()["id"])
-    
-    # 5. Добавляем навыки пользователям
-    # Первый пользователь: Python (уровень 5), JavaScript (уровень 3)
-    client.post(
-        f"/users/{user_ids[0]}/skills/{skill_ids[0]}",
-        params={"level": 5},
-        headers=auth_headers
-    )
-    client.post(
-        f"/users/{user_ids[0]}/skills/{skill_ids[1]}",
-        params={"level": 3},
-        headers=auth_headers
-    )
-    
-    # Второй пользователь: JavaScript (уровень 4), SQL (уровень 4)
-    client.post(
-        f"/users/{user_ids[1]}/skills/{skill_ids[1]}",
-        params={"level": 4},
-        headers=auth_headers
-    )
-    client.post(
-        f"/users/{user_ids[1]}/skills/{skill_ids[2]}",
-        params={"level": 4},
-        headers=auth_headers
-    )
-    
-    # Третий пользователь: Python (уровень 2), SQL (уровень 3), UI/UX (уровень 5)
-    client.post(
-        f"/users/{user_ids[2]}/skills/{skill_ids[0]}",
-        params={"level": 2},
-        headers=auth_headers
-    )
-    client.post(
-        f"/users/{user_ids[2]}/skills/{skill_ids[2]}",
-        params={"level": 3},
-        headers=auth_headers
-    )
-    client.post(
-        f"/users/{user_ids[2]}/skills/{skill_ids[3]}",
-        params={"level": 5},
-        headers=auth_headers
-    )
-    
-    # 6. Создаем задачи без назначения
-    task_ids = []
-    
-    # Задача 1: Python
-    task1_response = client.post(
-        "/tasks/",
-        json={
-            "title": "Python Task",
-            "description": "Task requiring Python",
-            "status": "todo",
-            "priority": "high",
-            "estimated_hours": 5.0,
-            "project_id": project_id,
-            "required_skills": [skill_ids[0]]  # Python
-        },
-        headers=auth_headers
-    )
-    task_ids.append(task1_response.json()["id"])
-    
-    # Задача 2: JavaScript
-    task2_response = client.post(
-        "/tasks/",
-        json={
-            "title": "JavaScript Task",
-            "description": "Task requiring JavaScript",
-            "status": "todo",
-            "priority": "medium",
-            "estimated_hours": 3.0,
-            "project_id": project_id,
-            "required_skills": [skill_ids[1]]  # JavaScript
-        },
-        headers=auth_headers
-    )
-    task_ids.append(task2_response.json()["id"])
-    
-    # Задача 3: SQL
-    task3_response = client.post(
-        "/tasks/",
-        json={
-            "title": "SQL Task",
-            "description": "Task requiring SQL",
-            "status": "todo",
-            "priority": "low",
-            "estimated_hours": 2.0,
-            "project_id": project_id,
-            "required_skills": [skill_ids[2]]  # SQL
-        },
-        headers=auth_headers
+        for i in range(3)
+    ]
+    skills = [
+        Skill(name=skill_name, description=f"Skill in {skill_name}")
+        for skill_name in ["Python", "JavaScript", "SQL", "UI/UX"]
+    ]
+    test_db_session.add_all([project, *users, *skills])
+    test_db_session.flush()
+    project_id = project.id
+    user_ids = [user.id for user in users]
+    skill_ids = [skill.id for skill in skills]
+    
+    # 2. Добавляем пользователей в проект
+    test_db_session.execute(
+        insert(project_user),
+        [{"project_id": project_id, "user_id": user_id} for user_id in [owner.id, *user_ids]]
     )
-    task_ids.append(task3_response.json()["id"])
     
-    # Задача 4: UI/UX
-    task4_response = client.post(
-        "/tasks/",
-        json={
-            "title": "UI/UX Task",
-            "description": "Task requiring UI/UX",
-            "status": "todo",
-            "priority": "critical",
-            "estimated_hours": 8.0,
-            "project_id": project_id,
-            "required_skills": [skill_ids[3]]  # UI/UX
-        },
-        headers=auth_headers
-    )
-    task_ids.append(task4_response.json()["id"])
+    # 3. Добавляем навыки пользователям
+    test_db_session.execute(insert(user_skill), [
+        # Первый пользователь: Python (уровень 5), JavaScript (уровень 3)
+        {"user_id": user_ids[0], "skill_id": skill_ids[0], "level": 5},
+        {"user_id": user_ids[0], "skill_id": skill_ids[1], "level": 3},
+        # Второй пользователь: JavaScript (уровень 4), SQL (уровень 4)
+        {"user_id": user_ids[1], "skill_id": skill_ids[1], "level": 4},
+        {"user_id": user_ids[1], "skill_id": skill_ids[2], "level": 4},
+        # Третий пользователь: Python (уровень 2), SQL (уровень 3), UI/UX (уровень 5)
+        {"user_id": user_ids[2], "skill_id": skill_ids[0], "level": 2},
+        {"user_id": user_ids[2], "skill_id": skill_ids[2], "level": 3},
+        {"user_id": user_ids[2], "skill_id": skill_ids[3], "level": 5},
+    ])
+    
+    # 4. Создаем задачи без назначения, каждая требует один навык
+    task_data = [
+        ("Python Task", models.TaskPriority.HIGH, 5.0),
+        ("JavaScript Task", models.TaskPriority.MEDIUM, 3.0),
+        ("SQL Task", models.TaskPriority.LOW, 2.0),
+        ("UI/UX Task", models.TaskPriority.CRITICAL, 8.0),
+    ]
+    tasks = [
+        Task(
+            title=title,
+            description=f"Task requiring {title.rsplit(' ', 1)[0]}",
+            status=models.TaskStatus.TODO,
+            priority=priority,
+            estimated_hours=estimated_hours,
+            project_id=project_id
+        )
+        for title, priority, estimated_hours in task_data
+    ]
+    test_db_session.add_all(tasks)
+    test_db_session.flush()
+    task_ids = [task.id for task in tasks]
+    test_db_session.execute(insert(task_skill), [
+        {"task_id": task_id, "skill_id": skill_id, "required_level": 1}
+        for task_id, skill_id in zip(task_ids, skill_ids)
+    ])
+    test_db_session.commit()
     
     return {
         "project_id": project_id,
@@ -423,6 +339,35 @@ def test_assign_tasks_no_tasks(test_db_session: Session, auth_headers: dict):
     assert len(data["assignments"]) == 0
     assert len(data["unassigned_tasks"]) == 0
 
+def test_assign_tasks_invalid_strategy(test_db_session: Session, auth_headers: dict):
+    response = client.post(
+        "/assign/tasks",
+        json={"project_id": 1, "optimize_for": "fastest"},
+        headers=auth_headers
+    )
+    assert response.status_code == 422
+
+def test_assign_tasks_project_not_found(test_db_session: Session):
+    with pytest.raises(ProjectNotFoundError):
+        assign_tasks(test_db_session, 9999)
+
+def test_assign_error_handler(test_db_session: Session, auth_headers: dict, monkeypatch):
+    project_response = client.post("/projects/", json={"name": "Failing Project"}, headers=auth_headers)
+    
+    def failing_assign_tasks(db, project_id, optimize_for):
+        error = AssignError("Nothing to assign")
+        error.status_code = 409
+        raise error
+    monkeypatch.setattr(assign, "assign_tasks", failing_assign_tasks)
+    
+    response = client.post(
+        "/assign/tasks",
+        json={"project_id": project_response.json()["id"], "optimize_for": "balanced"},
+        headers=auth_headers
+    )
+    assert response.status_code == 409
+    assert response.json() == {"detail": "Nothing to assign"}
+
 def test_assign_tasks_no_users_in_project(test_db_session: Session, auth_headers: dict):
     # Создаем проект
     project_response = client.post(
@@ -456,6 +401,102 @@ def test_assign_tasks_no_users_in_project(test_db_session: Session, auth_headers
     assert len(data["unassigned_tasks"]) == 1
     assert data["unassigned_tasks"][0] == task_id
 
+# Тесты для TaskAssignmentOptimizer
+
+def _create_optimizer_project(db: Session, n_users: int, n_tasks: int):
+    project = crud.create_project(db, schemas.ProjectCreate(name="Optimizer Project"))
+    users = []
+    for i in range(n_users):
+        user = crud.create_user(db, schemas.UserCreate(
+            username=f"opt_user{i}",
+            email=f"opt_user{i}@example.com",
+            password="password123"
+        ))
+        crud.add_user_to_project(db, project.id, user.id)
+        users.append(user)
+    tasks = []
+    for i in range(n_tasks):
+        tasks.append(crud.create_task(db, schemas.TaskCreate(
+            title=f"Optimizer Task {i}",
+            project_id=project.id,
+            estimated_hours=2.0
+        )))
+    return project, users, tasks
+
+def test_calculate_cost_matrix(test_db_session: Session):
+    project, users, tasks = _create_optimizer_project(test_db_session, n_users=2, n_tasks=3)
+    # Более загруженный пользователь должен стоить дороже для любой задачи
+    users[1].current_workload = 50.0
+    test_db_session.commit()
+    optimizer = TaskAssignmentOptimizer(test_db_session, project.id, optimize_for="workload")
+    
+    cost_matrix = optimizer.calculate_cost_matrix()
+    
+    assert cost_matrix.shape == (3, 2)
+    assert np.all((cost_matrix >= 0) & (cost_matrix <= 100))
+    assert np.all(cost_matrix[:, 1] > cost_matrix[:, 0])
+
+def test_calculate_skills_cost(test_db_session: Session):
+    project, users, tasks = _create_optimizer_project(test_db_session, n_users=2, n_tasks=1)
+    skill = crud.create_skill(test_db_session, schemas.SkillCreate(name="Optimizer Skill"))
+    crud.add_skill_to_task(test_db_session, tasks[0].id, skill.id, required_level=4)
+    crud.add_skill_to_user(test_db_session, users[0].id, skill.id, level=2)
+    optimizer = TaskAssignmentOptimizer(test_db_session, project.id)
+    
+    # Частичное соответствие: 50% + штраф, отсутствие навыка: максимальная стоимость
+    skills_cost = optimizer._calculate_skills_cost_matrix()
+    assert skills_cost.tolist() == [[60, 100]]
+
+def test_hungarian_algorithm_rectangular(test_db_session: Session):
+    project, _, _ = _create_optimizer_project(test_db_session, n_users=2, n_tasks=3)
+    optimizer = TaskAssignmentOptimizer(test_db_session, project.id)
+    
+    cost_matrix = np.array([
+        [4.0, 1.0],
+        [2.0, 8.0],
+        [3.0, 3.0],
+    ])
+    assignments = optimizer.hungarian_algorithm(cost_matrix)
+    
+    # Назначается min(задач, пользователей) пар с минимальной суммарной стоимостью
+    assert sorted(assignments) == [(0, 1), (1, 0)]
+    # Список списков приводится к ndarray
+    assert sorted(optimizer.hungarian_algorithm(cost_matrix.tolist())) == [(0, 1), (1, 0)]
+
+def test_hungarian_algorithm_degenerate(test_db_session: Session):
+    project, _, _ = _create_optimizer_project(test_db_session, n_users=1, n_tasks=1)
+    optimizer = TaskAssignmentOptimizer(test_db_session, project.id)
+    
+    assert optimizer.hungarian_algorithm(np.array([[5.0, 2.0, 7.0]])) == [(0, 1)]
+    assert optimizer.hungarian_algorithm(np.array([[5.0], [2.0], [7.0]])) == [(1, 0)]
+
+def test_optimize_assignments(test_db_session: Session):
+    project, users, tasks = _create_optimizer_project(test_db_session, n_users=2, n_tasks=3)
+    optimizer = TaskAssignmentOptimizer(test_db_session, project.id)
+    
+    result, unassigned_tasks = optimizer.optimize_assignments()
+    
+    assert len(result) == 2
+    assert len(unassigned_tasks) == 1
+    assert {a.assignee_id for a in result} == {user.id for user in users}
+    assigned_ids = {a.task_id for a in result}
+    assert assigned_ids | set(unassigned_tasks) == {task.id for task in tasks}
+    for assignment in result:
+        assert 0 <= assignment.match_score <= 100
+        assert crud.get_task(test_db_session, assignment.task_id).assignee_id == assignment.assignee_id
+    # Загрузка каждого исполнителя выросла на оценку назначенной ему задачи
+    for user in users:
+        assert crud.get_user(test_db_session, user.id).current_workload == 2.0
+
+def test_optimize_assignments_without_members(test_db_session: Session):
+    project, _, tasks = _create_optimizer_project(test_db_session, n_users=0, n_tasks=2)
+    optimizer = TaskAssignmentOptimizer(test_db_session, project.id)
+    
+    result = optimizer.optimize_assignments()
+    
+    assert result.assignments == []
+    assert result.unassigned_tasks == [task.id for task in tasks]
+
 # Старые тесты, которые нужно будет пересмотреть или удалить 
 # после рефакторинга setup_project_with_users_and_tasks в conftest.py
 
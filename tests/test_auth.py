@@ -9,6 +9,7 @@ from app.models import User
 from app import crud, schemas
 from app.auth import get_password_hash, verify_password, create_access_token
 from app.auth import SECRET_KEY, ALGORITHM
+import app.auth
 from .conftest import test_db_session, client, test_user
 
 def test_auth_flow(test_db_session: Session, test_user: User):
@@ -63,4 +64,36 @@ def test_create_access_token():
     # Verify that we can decode the token
     payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     assert payload["sub"] == "testuser"
-    assert "exp" in payload  # Verify the expiration is set 
\ No newline at end of file
+    assert "exp" in payload  # Verify the expiration is set 
+
+def test_verify_password_caches_successful_checks(monkeypatch):
+    """Test that a successful verification is not repeated with bcrypt"""
+    hashed_password = get_password_hash("cached_password")
+    assert verify_password("cached_password", hashed_password) is True
+    
+    def fail_verify(*args, **kwargs):
+        raise AssertionError("bcrypt should not be called for a cached password")
+    
+    monkeypatch.setattr(app.auth.pwd_context, "verify", fail_verify)
+    assert verify_password("cached_password", hashed_password) is True
+    
+    # A wrong password is never served from the cache
+    monkeypatch.undo()
+    assert verify_password("wrong_password", hashed_password) is False
+
+def test_decode_access_token_uses_cache(monkeypatch):
+    """Test that a decoded token is served from the cache until it expires"""
+    token = create_access_token({"sub": "cacheduser"})
+    assert app.auth.decode_access_token(token).username == "cacheduser"
+    
+    def fail_decode(*args, **kwargs):
+        raise AssertionError("jwt.decode should not be called for a cached token")
+    
+    monkeypatch.setattr(app.auth.jwt, "decode", fail_decode)
+    assert app.auth.decode_access_token(token).username == "cacheduser"
+    
+    # An entry past the token's own expiry is not served
+    token_data, _ = app.auth._decoded_tokens[token]
+    app.auth._decoded_tokens[token] = (token_data, 0)
+    with pytest.raises(AssertionError):
+        app.auth.decode_access_token(token)
@@ -85,6 +85,52 @@ def test_get_user_tasks(test_db_session: Session):
     for task in tasks:
         assert task.assignee_id == user.id
 
+def test_get_tasks_visible_to_user(test_db_session: Session):
+    user = crud.create_user(test_db_session, schemas.UserCreate(
+        username="visible_user", email="visible@example.com", password="password123"
+    ))
+    own_project = crud.create_project(test_db_session, schemas.ProjectCreate(name="Own Project"))
+    other_project = crud.create_project(test_db_session, schemas.ProjectCreate(name="Other Project"))
+    crud.add_user_to_project(test_db_session, own_project.id, user.id)
+    
+    own_tasks = [
+        crud.create_task(test_db_session, schemas.TaskCreate(title=f"Own {i}", project_id=own_project.id))
+        for i in range(3)
+    ]
+    crud.create_task(test_db_session, schemas.TaskCreate(title="Other", project_id=other_project.id))
+    
+    # Видны только задачи проектов пользователя, пагинация выполняется в запросе
+    tasks = crud.get_tasks_visible_to_user(test_db_session, user.id, skip=1, limit=5)
+    assert [task.id for task in tasks] == [task.id for task in own_tasks[1:]]
+    
+    # Потоковая выборка партиями возвращает ту же страницу
+    streamed = crud.iter_tasks(test_db_session, user.id, skip=1, limit=5, batch_size=1)
+    assert [task.id for task in streamed] == [task.id for task in own_tasks[1:]]
+    other_tasks = crud.iter_tasks(test_db_session, user.id, project_id=other_project.id)
+    assert [task.title for task in other_tasks] == ["Other"]
+
+def test_update_task_reassign_moves_workload(test_db_session: Session):
+    first, second = [
+        crud.create_user(test_db_session, schemas.UserCreate(
+            username=f"workload_user{i}", email=f"workload_user{i}@example.com", password="password123"
+        ))
+        for i in range(2)
+    ]
+    project = crud.create_project(test_db_session, schemas.ProjectCreate(name="Workload Project"))
+    task = crud.create_task(test_db_session, schemas.TaskCreate(
+        title="Task", project_id=project.id, estimated_hours=5.0
+    ))
+    
+    crud.update_task(test_db_session, task.id, schemas.TaskUpdate(assignee_id=first.id))
+    crud.update_task(test_db_session, task.id, schemas.TaskUpdate(assignee_id=second.id))
+    
+    # Часы задачи переходят от прежнего исполнителя к новому
+    assert crud.get_user(test_db_session, first.id).current_workload == 0.0
+    assert crud.get_user(test_db_session, second.id).current_workload == 5.0
+    
+    crud.delete_task(test_db_session, task.id)
+    assert crud.get_user(test_db_session, second.id).current_workload == 0.0
+
 def test_get_skill_by_name(test_db_session: Session):
     # Создаем навык
     skill_name = "Python"
@@ -152,6 +198,37 @@ def test_add_skill_to_task(test_db_session: Session):
     assert task_skill is not None
     assert task_skill.required_level == 4
 
+def test_add_skill_and_member_twice_upserts(test_db_session: Session):
+    skill = crud.create_skill(test_db_session, schemas.SkillCreate(name="Rust", description="Rust"))
+    project = crud.create_project(test_db_session, schemas.ProjectCreate(name="Upsert Project"))
+    user = crud.create_user(test_db_session, schemas.UserCreate(
+        username="upsert_user", email="upsert@example.com", password="password123"
+    ))
+    
+    crud.add_skill_to_user(test_db_session, user.id, skill.id, level=2)
+    crud.add_skill_to_user(test_db_session, user.id, skill.id, level=5)
+    crud.add_user_to_project(test_db_session, project.id, user.id)
+    crud.add_user_to_project(test_db_session, project.id, user.id)
+    
+    # Повторное добавление обновляет уровень, а не создает вторую запись
+    user_skills = crud.get_user_skills(test_db_session, user.id)
+    assert [(row.skill_id, row.skill_name, row.level) for row in user_skills] == [(skill.id, "Rust", 5)]
+    assert crud.get_project(test_db_session, project.id).members == [user]
+
+def test_get_user_with_skills(test_db_session: Session):
+    skill = crud.create_skill(test_db_session, schemas.SkillCreate(name="Go"))
+    user = crud.create_user(test_db_session, schemas.UserCreate(
+        username="skilled_user", email="skilled@example.com", password="password123"
+    ))
+    crud.add_skill_to_user(test_db_session, user.id, skill.id, level=3)
+    test_db_session.expire_all()
+    
+    loaded = crud.get_user_with_skills(test_db_session, user.id)
+    # Навыки загружены вместе с пользователем, без отложенного запроса
+    assert "skills" in loaded.__dict__
+    assert [s.name for s in loaded.skills] == ["Go"]
+    assert crud.get_user_with_skills(test_db_session, 9999) is None
+
 def test_remove_skill_from_task(test_db_session: Session):
     # Создаем навык
     skill = crud.create_skill(
@@ -194,6 +271,27 @@ def test_remove_skill_from_task(test_db_session: Session):
     # Проверяем результат
     assert result is not None
     assert skill not in result.required_skills
+    
+    # Неизвестный навык или задача дают None, как и раньше
+    assert crud.remove_skill_from_task(test_db_session, task.id, 9999) is None
+    assert crud.remove_skill_from_task(test_db_session, 9999, skill.id) is None
+
+def test_create_task_skips_unknown_and_duplicate_skills(test_db_session: Session):
+    skill = crud.create_skill(test_db_session, schemas.SkillCreate(name="Go", description="Go programming"))
+    project = crud.create_project(test_db_session, schemas.ProjectCreate(name="Skills Project"))
+    
+    task = crud.create_task(
+        db=test_db_session,
+        task=schemas.TaskCreate(
+            title="Task with Skills",
+            project_id=project.id,
+            estimated_hours=1.0,
+            required_skills=[skill.id, skill.id, 9999]
+        )
+    )
+    
+    # Несуществующий навык пропущен, дубликат добавлен один раз
+    assert [row.skill_id for row in crud.get_task_skills(test_db_session, task.id)] == [skill.id]
 
 def test_update_task_status(test_db_session: Session):
     # Создаем проект
@@ -239,6 +337,12 @@ def test_update_task_status(test_db_session: Session):
     # Проверяем, что completed_at установлено
     assert updated_task.status == models.TaskStatus.DONE
     assert updated_task.completed_at is not None
+    
+    # Повторная установка DONE не меняет дату завершения
+    completed_at = updated_task.completed_at
+    updated_task = crud.update_task_status(test_db_session, task.id, models.TaskStatus.DONE)
+    assert updated_task.completed_at == completed_at
+    assert crud.update_task_status(test_db_session, 9999, models.TaskStatus.DONE) is None
 
 def test_get_project_by_name(test_db_session: Session):
     # Создаем проект с уникальным именем
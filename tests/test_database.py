@@ -1,8 +1,11 @@
 import pytest
+from sqlalchemy import create_engine
 from sqlalchemy.orm import Session
 
+from app import crud
 from app.database import get_db, engine, Base
-from app.models import User
+from app.migrations import upgrade_schema
+from app.models import User, user_skill
 
 def test_get_db():
     """Test the get_db generator function"""
@@ -23,4 +26,63 @@ def test_get_db():
     assert isinstance(users, list)
     
     # Close the session
-    db.close() 
\ No newline at end of file
+    db.close()
+
+def _legacy_engine():
+    """SQLite в памяти со схемой ассоциативных таблиц до появления уникальных ключей"""
+    legacy = create_engine("sqlite://")
+    with legacy.begin() as conn:
+        Base.metadata.create_all(bind=conn, tables=[
+            table for table in Base.metadata.sorted_tables
+            if table.name not in ("project_user", "user_skill", "task_skill")
+        ])
+        conn.exec_driver_sql("CREATE TABLE project_user (user_id INTEGER, project_id INTEGER)")
+        conn.exec_driver_sql("CREATE TABLE user_skill (user_id INTEGER, skill_id INTEGER, level INTEGER)")
+        conn.exec_driver_sql("CREATE TABLE task_skill (task_id INTEGER, skill_id INTEGER, required_level INTEGER)")
+    return legacy
+
+def test_upgrade_schema_adds_association_keys():
+    """Проверяет, что upgrade_schema удаляет дубликаты и добавляет ключи для ON CONFLICT"""
+    legacy = _legacy_engine()
+    with legacy.begin() as conn:
+        conn.exec_driver_sql("INSERT INTO users (id, username, email) VALUES (1, 'legacy', 'legacy@example.com')")
+        conn.exec_driver_sql("INSERT INTO skills (id, name) VALUES (1, 'Legacy Skill')")
+        conn.exec_driver_sql("INSERT INTO user_skill VALUES (1, 1, 2), (1, 1, 4)")
+    
+    upgrade_schema(legacy)
+    upgrade_schema(legacy)  # повторный запуск ничего не меняет
+    
+    with Session(legacy) as db:
+        # Остается последняя строка, а повторное добавление обновляет уровень
+        assert db.query(user_skill.c.level).all() == [(4,)]
+        crud.add_skill_to_user(db, user_id=1, skill_id=1, level=5)
+        assert db.query(user_skill.c.level).all() == [(5,)]
+
+def _user_index_sql(conn):
+    return conn.exec_driver_sql(
+        "SELECT sql FROM sqlite_master WHERE name = 'ix_users_username_lower'"
+    ).scalar()
+
+def test_upgrade_schema_makes_user_lower_indexes_unique():
+    """Проверяет замену старых неуникальных индексов lower() на уникальные"""
+    legacy = _legacy_engine()
+    with legacy.begin() as conn:
+        conn.exec_driver_sql("DROP INDEX ix_users_username_lower")
+        conn.exec_driver_sql("CREATE INDEX ix_users_username_lower ON users (lower(username))")
+    
+    upgrade_schema(legacy)
+    
+    with legacy.connect() as conn:
+        assert "UNIQUE" in _user_index_sql(conn).upper()
+
+def test_upgrade_schema_keeps_index_when_users_differ_by_case():
+    """Проверяет, что существующие дубликаты по регистру не ломают запуск"""
+    legacy = _legacy_engine()
+    with legacy.begin() as conn:
+        conn.exec_driver_sql("DROP INDEX ix_users_username_lower")
+        conn.exec_driver_sql("INSERT INTO users (username, email) VALUES ('Dup', 'a@example.com'), ('dup', 'b@example.com')")
+    
+    upgrade_schema(legacy)
+    
+    with legacy.connect() as conn:
+        assert "UNIQUE" not in _user_index_sql(conn).upper()
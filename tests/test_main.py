@@ -1,7 +1,9 @@
 import pytest
 from fastapi.testclient import TestClient
 
+from app import main
 from app.main import app
+from .conftest import engine as test_engine
 
 client = TestClient(app)
 
@@ -23,4 +25,12 @@ def test_app_includes_routers():
     assert "/users/" in paths
     assert "/projects/" in paths
     assert "/tasks/" in paths
-    assert "/skills/" in paths 
\ No newline at end of file
+    assert "/skills/" in paths
+
+def test_health_check(monkeypatch):
+    """Test that the health endpoint pings the database"""
+    # Ping the in-memory test database instead of creating taskmaster.db
+    monkeypatch.setattr(main, "engine", test_engine)
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert response.json() == {"status": "healthy"}
@@ -319,4 +319,20 @@ def test_remove_user_from_project(test_db_session: Session, test_user: User):
     
     # Обновляем проект из БД и проверяем, что пользователь удален
     test_db_session.refresh(project)
-    assert user not in project.members 
\ No newline at end of file
+    assert user not in project.members
+
+def test_get_project_membership(test_db_session: Session, test_user: User):
+    """Тестирует проверку существования проекта и участия пользователя одним запросом"""
+    project = crud.create_project(
+        db=test_db_session,
+        project=schemas.ProjectCreate(name="Membership Project")
+    )
+    
+    assert crud.get_project_membership(test_db_session, project.id, test_user.id) == (True, False)
+    assert not crud.user_is_project_member(test_db_session, project.id, test_user.id)
+    
+    crud.add_user_to_project(test_db_session, project.id, test_user.id)
+    
+    assert crud.get_project_membership(test_db_session, project.id, test_user.id) == (True, True)
+    assert crud.user_is_project_member(test_db_session, project.id, test_user.id)
+    assert crud.get_project_membership(test_db_session, 9999, test_user.id) == (False, False)
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 
 from app.models import User
 from app import crud, models, schemas
+from app.etag import etag_matches
 from .conftest import test_db_session, auth_headers, test_user, client
 
 def test_create_skill(test_db_session: Session, auth_headers: dict):
@@ -48,6 +49,37 @@ def test_read_skills(test_db_session: Session, auth_headers: dict):
     # Проверяем имя первого навыка
     assert any(skill["name"] == "Test Skill 0" for skill in data)
 
+def test_read_skills_etag(test_db_session: Session, auth_headers: dict):
+    """Проверяет ответ 304 на повторный запрос списка навыков с тем же ETag"""
+    skill = crud.create_skill(test_db_session, schemas.SkillCreate(name="Cached Skill"))
+    
+    response = client.get("/skills/", headers=auth_headers)
+    etag = response.headers["ETag"]
+    
+    cached = client.get("/skills/", headers={**auth_headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    
+    # После изменения навыка ETag меняется
+    crud.update_skill(test_db_session, skill.id, schemas.SkillCreate(name="Renamed Skill"))
+    changed = client.get("/skills/", headers={**auth_headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()[0]["name"] == "Renamed Skill"
+
+def test_etag_matches_if_none_match_list():
+    """Проверяет разбор If-None-Match: список тегов, слабое сравнение и звездочку"""
+    etag = 'W/"abc"'
+    assert etag_matches('W/"abc"', etag)
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('"other", W/"abc"', etag)
+    assert etag_matches('*', etag)
+    assert not etag_matches('', etag)
+    assert not etag_matches('"other"', etag)
+    # Совпадение части тега не считается совпадением
+    assert not etag_matches('W/"abcd"', etag)
+    assert not etag_matches('W/"ab', etag)
+
 def test_read_skill(test_db_session: Session, auth_headers: dict):
     """Проверяет получение навыка по id"""
     # Создаем навык
@@ -268,4 +300,12 @@ def test_delete_skill(test_db_session: Session):
     
     # Проверяем, что удаление несуществующего навыка возвращает False
     result = crud.delete_skill(test_db_session, 9999)
-    assert result is False 
\ No newline at end of file
+    assert result is False
+
+def test_delete_skill_removes_associations(test_db_session: Session, test_user: User):
+    """Проверяет, что удаление навыка удаляет и его связи с пользователями"""
+    skill = crud.create_skill(test_db_session, schemas.SkillCreate(name="Linked Skill"))
+    crud.add_skill_to_user(test_db_session, test_user.id, skill.id, level=3)
+    
+    assert crud.delete_skill(test_db_session, skill.id) is True
+    assert crud.get_user_skills(test_db_session, test_user.id) == [] 
\ No newline at end of file
@@ -92,6 +92,13 @@ def test_read_tasks(test_db_session: Session, auth_headers: dict, test_user: Use
     # Проверяем, что в списке есть задачи из созданного проекта
     project_tasks = [task for task in data if task["project_id"] == project.id]
     assert len(project_tasks) >= 3
+    
+    # Тот же список построчно в NDJSON
+    response = client.get("/tasks/", headers={**auth_headers, "Accept": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == [task["id"] for task in data]
 
 def test_read_task(test_db_session: Session, auth_headers: dict, test_user: User):
     """Проверяет получение задачи по id"""
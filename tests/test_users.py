@@ -1,14 +1,19 @@
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 import uuid
+import asyncio
+import threading
 from datetime import timedelta
 from passlib.context import CryptContext
+import httpx
+from anyio import to_thread
 
+from app import main
 from app.main import app
 from app.database import Base, get_db
 from app.models import User
@@ -16,6 +21,7 @@ from app import crud, models, schemas
 from app.routers import users
 from .conftest import test_db_session, auth_headers, test_user, client
 from app.auth import get_password_hash
+from app import auth
 
 # Создаем контекст хэширования для проверки паролей
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -132,6 +138,68 @@ def test_login_invalid_credentials(test_db_session: Session):
     assert response.status_code == 401
     assert response.json()["detail"] == "Incorrect username or password"
 
+def test_login_unknown_user_still_verifies_password(test_db_session: Session, monkeypatch):
+    """Проверяет, что для несуществующего пользователя bcrypt тоже выполняется"""
+    checked_hashes = []
+    def fake_verify_password(plain_password, hashed_password):
+        checked_hashes.append(hashed_password)
+        return False
+    monkeypatch.setattr(users, "verify_password", fake_verify_password)
+    
+    response = client.post("/users/token", data={"username": "nobody", "password": "password"})
+    
+    assert response.status_code == 401
+    assert checked_hashes == [auth.DUMMY_PASSWORD_HASH]
+
+def test_concurrent_logins_exceed_db_pool(tmp_path, monkeypatch):
+    """Проверяет, что проверки bcrypt при входе идут параллельно и не держат соединение с БД"""
+    # Пул из одного соединения: если бы вход держал его во время bcrypt,
+    # до барьера дошел бы только один запрос
+    pool_engine = create_engine(
+        f"sqlite:///{tmp_path / 'login.db'}",
+        connect_args={"check_same_thread": False},
+        pool_size=1, max_overflow=0, pool_timeout=1,
+    )
+    Base.metadata.create_all(bind=pool_engine)
+    PoolSession = sessionmaker(autocommit=False, autoflush=False, bind=pool_engine)
+    with PoolSession() as db:
+        db.add(User(username="poolme", email="poolme@example.com",
+                    hashed_password=get_password_hash("password")))
+        db.commit()
+
+    def override_get_db():
+        db = PoolSession()
+        try:
+            yield db
+        finally:
+            db.close()
+    monkeypatch.setitem(app.dependency_overrides, get_db, override_get_db)
+
+    logins = 4
+    barrier = threading.Barrier(logins, timeout=5)
+    def verify_password_in_parallel(plain_password, hashed_password):
+        barrier.wait()
+        return auth.verify_password(plain_password, hashed_password)
+    monkeypatch.setattr(users, "verify_password", verify_password_in_parallel)
+
+    async def login_concurrently():
+        # Лимит пула потоков, который задает lifespan приложения
+        to_thread.current_default_thread_limiter().total_tokens = main.THREADPOOL_SIZE
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+            return await asyncio.gather(*(
+                async_client.post("/users/token", data={"username": "poolme", "password": "password"})
+                for _ in range(logins)
+            ))
+
+    try:
+        responses = asyncio.run(login_concurrently())
+    finally:
+        pool_engine.dispose()
+
+    assert main.THREADPOOL_SIZE >= logins
+    assert [response.status_code for response in responses] == [200] * logins
+
 def test_read_users_me(test_db_session: Session):
     # Регистрируем пользователя
     client.post(
@@ -238,7 +306,7 @@ def test_create_user_duplicate_email(test_db_session: Session):
     # Test API endpoint
     response = client.post("/users/register", json=second_user.model_dump())
     assert response.status_code == 400
-    assert "already registered" in response.json().get("detail", "")
+    assert response.json().get("detail") == "Email already registered"
 
 def test_read_users(test_db_session: Session, auth_headers: dict):
     """Проверяет получение списка пользователей"""
@@ -379,6 +447,25 @@ def test_delete_user(test_db_session: Session, auth_headers: dict):
     deleted_user = crud.get_user(test_db_session, user.id)
     assert deleted_user is None or deleted_user.is_active is False
 
+def test_update_user_duplicate_ignores_case(test_db_session: Session, auth_headers: dict, test_user: User):
+    """Проверяет 400 при смене имени или email на занятые, отличающиеся только регистром"""
+    other = crud.create_user(test_db_session, schemas.UserCreate(
+        username="otheruser", email="other@example.com", password="password"
+    ))
+    
+    for payload in ({"username": "TESTUSER"}, {"email": "TEST@example.com"}):
+        response = client.put(f"/users/{other.id}", json=payload, headers=auth_headers)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Username or email already registered"
+    
+    assert crud.get_user(test_db_session, other.id).username == "otheruser"
+
+def test_update_user_not_found(test_db_session: Session, auth_headers: dict):
+    response = client.put("/users/999", json={"workload_capacity": 50.0}, headers=auth_headers)
+    
+    assert response.status_code == 404
+    assert response.json()["detail"] == "User not found"
+
 def test_delete_user_not_found(test_db_session: Session, auth_headers: dict):
     response = client.delete(f"/users/999", headers=auth_headers)
     
@@ -417,6 +504,23 @@ def test_add_skill_to_user(test_db_session: Session, auth_headers: dict, test_us
     assert user_skill is not None
     assert user_skill.level == 4
 
+def test_add_skill_to_user_not_found(test_db_session: Session, auth_headers: dict, test_user: User):
+    """Проверяет 404 для несуществующего навыка или пользователя"""
+    skill = crud.create_skill(test_db_session, schemas.SkillCreate(name="Known Skill"))
+    
+    response = client.post(f"/users/{test_user.id}/skills/9999", headers=auth_headers)
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Skill not found"
+    
+    response = client.post(f"/users/9999/skills/{skill.id}", headers=auth_headers)
+    assert response.status_code == 404
+    assert response.json()["detail"] == "User not found"
+    
+    response = client.delete(f"/users/9999/skills/{skill.id}", headers=auth_headers)
+    assert response.status_code == 404
+    assert response.json()["detail"] == "User not found"
+    assert crud.check_user_and_skill_exist(test_db_session, test_user.id, skill.id) == (True, True)
+
 def test_remove_skill_from_user(test_db_session: Session, auth_headers: dict, test_user: User):
     """Проверяет удаление навыка у пользователя"""
     # Создаем навык
@@ -503,6 +607,31 @@ def test_get_user_by_email_direct(test_db_session: Session, test_user: User):
     non_existent_user = crud.get_user_by_email(test_db_session, "nonexistent@example.com")
     assert non_existent_user is None
 
+def test_get_user_by_username_ignores_case_only(test_db_session: Session, test_user: User):
+    """Проверяет, что поиск по имени не зависит от регистра, но не поддерживает шаблоны LIKE"""
+    retrieved_user = crud.get_user_by_username(test_db_session, test_user.username.upper())
+    
+    assert retrieved_user is not None
+    assert retrieved_user.id == test_user.id
+    assert crud.get_user_by_username(test_db_session, "%") is None
+    assert crud.get_user_by_email(test_db_session, "%@example.com") is None
+
+def test_get_login_credentials(test_db_session: Session, test_user: User):
+    """Проверяет выборку имени и хеша пароля для входа"""
+    credentials = crud.get_login_credentials(test_db_session, "TestUser")
+    
+    assert credentials == (test_user.username, test_user.hashed_password)
+    assert crud.get_login_credentials(test_db_session, "nonexistent") is None
+
+def test_create_user_duplicate_ignores_case(test_db_session: Session, test_user: User):
+    """Проверяет, что уникальные индексы отклоняют имя и email, отличающиеся только регистром"""
+    same_username = schemas.UserCreate(username="TESTUSER", email="other@example.com", password="password")
+    same_email = schemas.UserCreate(username="otheruser", email="TEST@example.com", password="password")
+    
+    assert crud.create_user(test_db_session, same_username) is None
+    assert crud.create_user(test_db_session, same_email) is None
+    assert crud.get_user_by_username(test_db_session, "testuser").id == test_user.id
+
 def test_update_user_direct(test_db_session: Session, test_user: User):
     """Проверяет обновление пользователя напрямую через CRUD"""
     # Получаем пользователя
@@ -530,4 +659,29 @@ def test_update_user_direct(test_db_session: Session, test_user: User):
         user_id=9999,
         user=schemas.UserUpdate(email="should@not.update")
     )
-    assert non_existent_update is None 
\ No newline at end of file
+    assert non_existent_update is None
+
+def test_update_user_skips_unchanged_values(test_db_session: Session, test_user: User):
+    """Проверяет, что пустое обновление не выполняет UPDATE, а неизменные значения не записываются"""
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    engine = test_db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        assert crud.update_user(test_db_session, test_user.id, schemas.UserUpdate()).id == test_user.id
+        assert not any(statement.startswith("UPDATE") for statement in statements)
+        
+        same = schemas.UserUpdate(email=test_user.email, workload_capacity=test_user.workload_capacity)
+        assert crud.update_user(test_db_session, test_user.id, same).email == test_user.email
+        assert crud.update_user(test_db_session, 9999, same) is None
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    
+    # UPDATE выполняется только для строк, где значения отличаются
+    update_statements = [statement for statement in statements if statement.startswith("UPDATE")]
+    assert update_statements and all("IS NOT" in statement for statement in update_statements)
+    
+    # Пароль всегда перезаписывается
+    updated = crud.update_user(test_db_session, test_user.id, schemas.UserUpdate(password="newpassword"))
+    assert auth.verify_password("newpassword", updated.hashed_password)